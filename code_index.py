@@ -0,0 +1,232 @@
+# ============================================================================
+# 🔍 Code Index - In-memory identifier index and symbol table for search_code
+# ============================================================================
+
+import ast
+import os
+import re
+import threading
+from collections import defaultdict
+import workspace_paths
+
+SKIP_DIRS = workspace_paths.SKIP_DIRS
+
+INDEXED_EXTENSIONS = (".py", ".js", ".jsx", ".ts", ".tsx", ".mjs", ".cjs",
+                      ".html", ".css", ".json", ".toml", ".yaml", ".yml", ".md")
+JS_EXTENSIONS = (".js", ".jsx", ".ts", ".tsx", ".mjs", ".cjs")
+
+MAX_FILE_SIZE = 512 * 1024      # Skip generated bundles and lockfile-sized files
+MAX_RESULTS = 20
+MAX_SNIPPET = 120
+
+_IDENTIFIER_PATTERN = re.compile(r"[A-Za-z_$][A-Za-z0-9_$]*")
+
+_JS_SYMBOL_PATTERNS = [
+    (re.compile(r"^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*([A-Za-z_$][\w$]*)"), "function"),
+    (re.compile(r"^\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?class\s+([A-Za-z_$][\w$]*)"), "class"),
+    (re.compile(r"^\s*(?:export\s+)?(?:const|let|var)\s+([A-Za-z_$][\w$]*)\s*=\s*(?:async\s*)?(?:\([^)]*\)|[A-Za-z_$][\w$]*)\s*=>"), "function"),
+    (re.compile(r"^\s*(?:export\s+)?(?:const|let|var)\s+([A-Za-z_$][\w$]*)\s*="), "variable"),
+    (re.compile(r"^\s*(?:export\s+)?(?:interface|type|enum)\s+([A-Za-z_$][\w$]*)"), "type"),
+]
+
+# path -> {"mtime": float, "lines": [str]}
+_files = {}
+# identifier -> {(path, line_number)}
+_postings = defaultdict(set)
+# name -> [(path, line_number, kind)]
+_symbols = defaultdict(list)
+# Tasks may run in parallel (see main.run_repl)
+_lock = threading.RLock()
+# True until the first full scan, and again after shell commands may have changed files
+_stale = True
+
+def _should_index(path):
+    return path.endswith(INDEXED_EXTENSIONS)
+
+def _iter_workspace_files(root="."):
+    """Yield indexable files, skipping dependency and build directories"""
+    agent_files = workspace_paths.agent_files()
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames[:] = [name for name in dirnames if name not in SKIP_DIRS and not name.startswith(".")]
+        for filename in filenames:
+            path = os.path.normpath(os.path.join(directory, filename))
+            if _should_index(filename) and path not in agent_files:
+                yield path
+
+def _python_symbols(content):
+    """Extract definitions from Python source with ast"""
+    try:
+        tree = ast.parse(content)
+    except SyntaxError:
+        return []
+
+    symbols = []
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            symbols.append((node.name, node.lineno, "function"))
+        elif isinstance(node, ast.ClassDef):
+            symbols.append((node.name, node.lineno, "class"))
+    # Module-level assignments (constants, app objects, routers)
+    for node in tree.body:
+        if isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                if isinstance(target, ast.Name):
+                    symbols.append((target.id, node.lineno, "variable"))
+    return symbols
+
+def _js_symbols(lines):
+    """Extract definitions from JS/TS source with line-based regexes"""
+    symbols = []
+    for line_number, line in enumerate(lines, 1):
+        for pattern, kind in _JS_SYMBOL_PATTERNS:
+            match = pattern.match(line)
+            if match:
+                symbols.append((match.group(1), line_number, kind))
+                break
+    return symbols
+
+def _remove_file(path):
+    """Drop a file's postings and symbols from the index"""
+    entry = _files.pop(path, None)
+    if not entry:
+        return
+    for identifier in entry["identifiers"]:
+        postings = _postings.get(identifier)
+        if postings:
+            postings.difference_update({item for item in postings if item[0] == path})
+            if not postings:
+                del _postings[identifier]
+    for name in entry["symbols"]:
+        remaining = [symbol for symbol in _symbols.get(name, []) if symbol[0] != path]
+        if remaining:
+            _symbols[name] = remaining
+        else:
+            _symbols.pop(name, None)
+
+def _index_path(path):
+    """Key files by their path relative to the workspace root, however they were named"""
+    try:
+        return os.path.normpath(os.path.relpath(path))
+    except ValueError:  # Different drive on Windows
+        return os.path.normpath(os.path.abspath(path))
+
+def mark_stale():
+    """Note that files may have changed outside write_file (shell commands, rollback)"""
+    global _stale
+    _stale = True
+
+def update_file(path, content=None):
+    """Index (or re-index) a single file; called after each write_file"""
+    with _lock:
+        path = _index_path(path)
+        _remove_file(path)
+        if not _should_index(path) or any(part in SKIP_DIRS for part in path.split(os.sep)):
+            return
+
+        try:
+            mtime = os.path.getmtime(path)
+            if content is None:
+                if os.path.getsize(path) > MAX_FILE_SIZE:
+                    return
+                with open(path, "r", encoding="utf-8", errors="replace") as f:
+                    content = f.read()
+        except OSError:
+            return
+
+        lines = content.splitlines()
+        identifiers = set()
+        for line_number, line in enumerate(lines, 1):
+            for identifier in set(_IDENTIFIER_PATTERN.findall(line)):
+                _postings[identifier].add((path, line_number))
+                identifiers.add(identifier)
+
+        if path.endswith(".py"):
+            symbols = _python_symbols(content)
+        elif path.endswith(JS_EXTENSIONS):
+            symbols = _js_symbols(lines)
+        else:
+            symbols = []
+        for name, line_number, kind in symbols:
+            _symbols[name].append((path, line_number, kind))
+
+        _files[path] = {
+            "mtime": mtime,
+            "lines": lines,
+            "identifiers": identifiers,
+            "symbols": {name for name, _, _ in symbols},
+        }
+
+def sync_index(root="."):
+    """Incrementally bring the index up to date (new, changed and deleted files)"""
+    global _stale
+    with _lock:
+        _stale = False
+        seen = set()
+        for path in _iter_workspace_files(root):
+            seen.add(path)
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            entry = _files.get(path)
+            if entry is None or entry["mtime"] != mtime:
+                update_file(path)
+        for path in list(_files):
+            if path not in seen and not os.path.exists(path):
+                _remove_file(path)
+
+def _snippet(path, line_number):
+    line = _files[path]["lines"][line_number - 1].strip()
+    return line if len(line) <= MAX_SNIPPET else line[:MAX_SNIPPET] + "..."
+
+def find_definitions(name):
+    """Return [(path, line_number, kind)] where name is defined"""
+    return sorted(_symbols.get(name, []))
+
+def find_usages(name):
+    """Return [(path, line_number)] where the identifier appears"""
+    return sorted(_postings.get(name, ()))
+
+def find_text(text):
+    """Case-insensitive substring search over indexed lines"""
+    needle = text.lower()
+    return [
+        (path, line_number)
+        for path in sorted(_files)
+        for line_number, line in enumerate(_files[path]["lines"], 1)
+        if needle in line.lower()
+    ]
+
+def search(query, kind="all"):
+    """Search the workspace index and return a compact file:line report"""
+    with _lock:
+        if _stale:
+            sync_index()
+        query = query.strip()
+        if not query:
+            return "❌ Empty search query"
+
+        sections = []
+        if _IDENTIFIER_PATTERN.fullmatch(query):
+            definitions = find_definitions(query) if kind in ("all", "definition") else []
+            defined_at = {(path, line_number) for path, line_number, _ in definitions}
+            usages = [item for item in find_usages(query) if item not in defined_at] if kind in ("all", "usage") else []
+            if definitions:
+                sections.append(f"📍 Definitions of '{query}' ({len(definitions)}):")
+                sections.extend(f"  {path}:{line}  [{symbol_kind}] {_snippet(path, line)}"
+                                for path, line, symbol_kind in definitions[:MAX_RESULTS])
+            if usages:
+                sections.append(f"🔗 Usages of '{query}' ({len(usages)}):")
+                sections.extend(f"  {path}:{line}  {_snippet(path, line)}" for path, line in usages[:MAX_RESULTS])
+            if definitions or usages:
+                return "\n".join(sections)
+
+        matches = find_text(query)
+        if not matches:
+            return f"🔍 No matches for '{query}' in {len(_files)} indexed files"
+        sections.append(f"🔍 Lines matching '{query}' ({len(matches)}):")
+        sections.extend(f"  {path}:{line}  {_snippet(path, line)}" for path, line in matches[:MAX_RESULTS])
+        if len(matches) > MAX_RESULTS:
+            sections.append(f"  ... {len(matches) - MAX_RESULTS} more")
+        return "\n".join(sections)
@@ -0,0 +1,190 @@
+# ============================================================================
+# 📈 Load Test - asyncio HTTP load generator for locally running servers
+# ============================================================================
+
+import asyncio
+import json
+import math
+import random
+import socket
+import time
+from urllib.parse import urlsplit
+
+MAX_CONCURRENCY = 200
+MAX_DURATION = 60               # Seconds
+
+# Last result per (url, mix), for before/after comparisons
+_history = {}
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def _build_request(host_header, request):
+    """Serialize one request of the mix as HTTP/1.1 bytes"""
+    body = request.get("body")
+    if isinstance(body, (dict, list)):
+        body = json.dumps(body)
+    body = (body or "").encode("utf-8")
+
+    lines = [
+        f"{request.get('method', 'GET').upper()} {request.get('path', '/')} HTTP/1.1",
+        f"Host: {host_header}",
+        "Connection: keep-alive",
+        "User-Agent: benchmark_endpoint",
+    ]
+    if body:
+        lines.append(f"Content-Type: {request.get('content_type', 'application/json')}")
+        lines.append(f"Content-Length: {len(body)}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+async def _read_response(reader):
+    """Read one HTTP/1.1 response; returns (status, keep_alive)"""
+    head = await reader.readuntil(b"\r\n\r\n")
+    header_lines = head.decode("latin-1").split("\r\n")
+    version, status = header_lines[0].split()[:2]
+    status = int(status)
+    headers = {}
+    for line in header_lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip().lower()
+
+    if "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    elif headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif status not in (204, 304):
+        await reader.read()  # Body ends when the server closes the connection
+        return status, False
+    if version == "HTTP/1.0":
+        return status, headers.get("connection") == "keep-alive"
+    return status, headers.get("connection") != "close"
+
+async def _worker(target, mix, weights, deadline, timeout, results, rng):
+    """Send requests back to back on one keep-alive connection until the deadline"""
+    host, port, host_header = target
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        request = rng.choices(mix, weights=weights)[0]
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+            writer.write(request["_bytes"])
+            await writer.drain()
+            status, keep_alive = await asyncio.wait_for(_read_response(reader), timeout)
+            results.append((time.perf_counter() - started, status))
+            if not keep_alive:
+                writer.close()
+                reader = writer = None
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError) as e:
+            results.append((time.perf_counter() - started, type(e).__name__))
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+async def _run(target, mix, concurrency, duration, timeout):
+    weights = [request.get("weight", 1) for request in mix]
+    results = []
+    deadline = time.perf_counter() + duration
+    rng = random.Random(42)  # Same request sequence on every run, for fair before/after numbers
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        _worker(target, mix, weights, deadline, timeout, results, rng)
+        for _ in range(concurrency)
+    ])
+    return results, time.perf_counter() - started
+
+def summarize(results, elapsed):
+    """Compute throughput, latency percentiles and error rate (4xx/5xx and connection errors)"""
+    latencies = sorted(latency * 1000 for latency, _ in results)
+    statuses = {}
+    errors = 0
+    for _, status in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+        if not isinstance(status, int) or status >= 400:
+            errors += 1
+    total = len(results)
+    return {
+        "requests": total,
+        "throughput": total / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "max": latencies[-1] if latencies else 0.0,
+        "error_rate": errors / total if total else 0.0,
+        "statuses": statuses,
+    }
+
+def _format_change(label, before, after, lower_is_better):
+    if not before:
+        return None
+    change = (after - before) / before * 100
+    better = change < 0 if lower_is_better else change > 0
+    return f"{label} {change:+.1f}% {'✅' if better else '⚠️'}"
+
+def format_report(url, concurrency, duration, summary, previous=None):
+    """Format a compact benchmark report, with a comparison to the previous run"""
+    lines = [
+        f"📈 Benchmark {url} ({concurrency} connections, {duration:g}s)",
+        f"   Requests: {summary['requests']}  Throughput: {summary['throughput']:.1f} req/s",
+        f"   Latency ms: p50 {summary['p50']:.1f}  p95 {summary['p95']:.1f}  "
+        f"p99 {summary['p99']:.1f}  max {summary['max']:.1f}",
+        f"   Error rate: {summary['error_rate']:.1%}  Statuses: "
+        + ", ".join(f"{status}×{count}" for status, count in sorted(summary["statuses"].items())),
+    ]
+    if previous:
+        changes = [
+            _format_change("throughput", previous["throughput"], summary["throughput"], False),
+            _format_change("p95", previous["p95"], summary["p95"], True),
+            _format_change("p99", previous["p99"], summary["p99"], True),
+        ]
+        lines.append("   vs previous run: " + ", ".join(change for change in changes if change))
+    return "\n".join(lines)
+
+def benchmark(url, concurrency=10, duration=10, requests=None, timeout=5):
+    """Load-test a local HTTP server and return a formatted report"""
+    parts = urlsplit(url if "://" in url else f"http://{url}")
+    if parts.scheme != "http":
+        return "❌ Only plain http:// URLs of local servers are supported"
+    host = parts.hostname or "localhost"
+    port = parts.port or 80
+    host_header = f"{host}:{port}"
+
+    try:
+        socket.create_connection((host, port), timeout=timeout).close()
+    except OSError as e:
+        return f"❌ Could not reach {host_header} ({e}). Start the server with run_project first."
+
+    concurrency = max(1, min(int(concurrency), MAX_CONCURRENCY))
+    duration = max(1, min(float(duration), MAX_DURATION))
+
+    default_path = parts.path or "/"
+    if parts.query:
+        default_path += f"?{parts.query}"
+    mix = [dict(request) for request in (requests or [{"method": "GET", "path": default_path}])]
+    for request in mix:
+        request["_bytes"] = _build_request(host_header, request)
+
+    results, elapsed = asyncio.run(_run((host, port, host_header), mix, concurrency, duration, timeout))
+    summary = summarize(results, elapsed)
+    if summary["requests"] and summary["error_rate"] == 1.0 and not any(
+        status.isdigit() for status in summary["statuses"]
+    ):
+        return (f"❌ Could not reach {host_header} ({', '.join(summary['statuses'])}). "
+                f"Start the server with run_project first.")
+
+    key = (url, json.dumps([{k: v for k, v in r.items() if k != "_bytes"} for r in mix], sort_keys=True))
+    previous = _history.get(key)
+    _history[key] = summary
+    return format_report(url, concurrency, duration, summary, previous)
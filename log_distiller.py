@@ -0,0 +1,210 @@
+# ============================================================================
+# 🧹 Log Distiller - Shrink noisy command output before it enters the conversation
+# ============================================================================
+
+import re
+from collections import Counter
+
+ENABLED = True
+DISTILLED_TOOLS = {"run_command", "run_project"}  # Never distill file contents
+MIN_DISTILL_BYTES = 8 * 1024    # Smaller run_command output is left alone unless it's an install/server command
+MAX_LINES = 60                  # Shorter output never loses lines; longer output is cut to head/tail
+HEAD_LINES = 15
+TAIL_LINES = 25
+ERROR_CONTEXT = 2               # Lines kept around each error line
+MAX_ERROR_LINES = 40
+
+_ANSI_PATTERN = re.compile(r"\x1b\[[0-9;?]*[ -/]*[@-~]|\x1b\][^\x07]*\x07|\x1b[@-Z\\-_]")
+
+# Progress bars, spinners and download meters
+_PROGRESS_PATTERNS = [
+    re.compile(r"^\s*[|/\\\-⠁-⣿]\s*$"),
+    re.compile(r"[━█▓▒░]{8,}|\[[#=>.\- ]{10,}\]"),
+    re.compile(r"^\s*\d{1,3}%\s*\|"),
+    re.compile(r"^\s*(Downloading|Progress|Resolving|Fetching)\b.*\d+(\.\d+)?\s*(k?B|MB|%)", re.IGNORECASE),
+    re.compile(r"^\s*(idealTree|reify|timing|sill|http fetch)\b"),
+]
+
+_ERROR_PATTERN = re.compile(
+    r"(\w*Error\b|\berror\b|ERROR|ERR!|\w*Exception\b|\b[Ff]ailed\b|FAILED|\b[Ff]atal\b|"
+    r"Traceback \(most recent call last\)|\bE[A-Z]{3,}\b|Cannot find module)"
+)
+
+# Commands whose output is install/server noise even when it's short
+_NOISY_COMMAND_PATTERN = re.compile(
+    r"\b(npm|yarn|pnpm)\s+(install|i|ci|add|create|init|start|run)\b|\bnpx\b|\bpip3?\s+install\b|"
+    r"\buvicorn\b|\bmanage\.py\s+(runserver|migrate)\b|\bvite\b"
+)
+
+# Tool results that start with one of these keep that line first
+_STATUS_PREFIXES = ("✅", "❌", "⚠️", "Error executing tool")
+
+# Lines that repeat throughout installs; collapsed wherever they occur
+_REPEATED_NOISE_PATTERN = re.compile(
+    r"(npm WARN|npm warn|deprecated|Requirement already satisfied|WARNING:|DeprecationWarning)"
+)
+
+# (tool name, outcome, pattern) - outcome is "ok" or "fail"
+KNOWN_PATTERNS = [
+    ("npm", "ok", re.compile(r"(added|removed|changed|up to date).*\d+ packages?.*|up to date, audited \d+ packages?")),
+    ("npm", "fail", re.compile(r"npm ERR! (code \w+|ERESOLVE.*|missing script: .*|404 .*)|npm error code \w+")),
+    ("pip", "ok", re.compile(r"Successfully installed .*")),
+    ("pip", "fail", re.compile(r"ERROR: (Could not find a version.*|No matching distribution.*|Could not install packages.*)")),
+    ("uvicorn", "ok", re.compile(r"Uvicorn running on \S+|Application startup complete\.")),
+    ("uvicorn", "fail", re.compile(r"\[Errno \d+\] .*address already in use|Error loading ASGI app.*", re.IGNORECASE)),
+    ("django", "ok", re.compile(r"Starting development server at \S+|System check identified no issues.*")),
+    ("django", "fail", re.compile(r"Error: That port is already in use\.|django\.core\.exceptions\.\w+.*")),
+    ("vite", "ok", re.compile(r"Local:\s+http://\S+")),
+]
+
+# Cumulative before/after byte counts across calls
+_stats = {"calls": 0, "bytes_in": 0, "bytes_out": 0}
+
+def strip_ansi(text):
+    """Remove ANSI escape sequences"""
+    return _ANSI_PATTERN.sub("", text)
+
+def resolve_carriage_returns(text):
+    """Keep only the final state of lines redrawn with \\r (progress output)"""
+    lines = []
+    for line in text.split("\n"):
+        if "\r" in line:
+            segments = [segment for segment in line.split("\r") if segment.strip()]
+            line = segments[-1] if segments else ""
+        lines.append(line.rstrip())
+    return lines
+
+def is_progress_line(line):
+    return any(pattern.search(line) for pattern in _PROGRESS_PATTERNS)
+
+def collapse_repeats(lines):
+    """Collapse consecutive duplicates and repeated warnings into one line with a count"""
+    noise_counts = Counter(line for line in lines if _REPEATED_NOISE_PATTERN.search(line))
+    collapsed = []
+    emitted_noise = set()
+    previous, run = None, 0
+    
+    def flush():
+        if previous is not None:
+            collapsed.append(f"{previous} (x{run})" if run > 1 and previous.strip() else previous)
+    
+    for line in lines:
+        if line in noise_counts:
+            if line in emitted_noise:
+                continue
+            emitted_noise.add(line)
+            flush()
+            previous, run = None, 0
+            count = noise_counts[line]
+            collapsed.append(f"{line} (x{count})" if count > 1 else line)
+        elif line == previous:
+            run += 1
+        else:
+            flush()
+            previous, run = line, 1
+    flush()
+    return collapsed
+
+def extract_errors(lines):
+    """Return error lines and Python stack traces with a little context"""
+    keep = set()
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        if line.startswith("Traceback (most recent call last)"):
+            # Keep the whole traceback up to and including the exception line
+            start = index
+            index += 1
+            while index < len(lines) and (lines[index].startswith((" ", "\t")) or not lines[index].strip()):
+                index += 1
+            keep.update(range(start, min(index + 1, len(lines))))
+        elif _ERROR_PATTERN.search(line):
+            keep.update(range(max(0, index - ERROR_CONTEXT), min(len(lines), index + ERROR_CONTEXT + 1)))
+        index += 1
+
+    errors = []
+    previous = None
+    for line_index in sorted(keep):
+        if previous is not None and line_index != previous + 1:
+            errors.append("...")
+        errors.append(lines[line_index])
+        previous = line_index
+    return errors[:MAX_ERROR_LINES]
+
+def detect_outcomes(lines):
+    """Match known npm/pip/uvicorn/django/vite success and failure lines"""
+    outcomes = []
+    for line in lines:
+        for tool, outcome, pattern in KNOWN_PATTERNS:
+            match = pattern.search(line)
+            if match:
+                icon = "✅" if outcome == "ok" else "❌"
+                summary = f"{icon} {tool}: {match.group(0).strip()}"
+                if summary not in outcomes:
+                    outcomes.append(summary)
+    return outcomes
+
+def distill(text):
+    """Distill raw command output; returns (distilled_text, bytes_in, bytes_out)"""
+    bytes_in = len(text.encode("utf-8", errors="replace"))
+    lines = resolve_carriage_returns(strip_ansi(text))
+    if len(lines) > MAX_LINES:
+        # Only long output loses lines; short output may be file contents (cat)
+        lines = [line for line in lines if not is_progress_line(line)]
+        lines = collapse_repeats(lines)
+    while lines and not lines[-1]:
+        lines.pop()
+
+    outcomes = detect_outcomes(lines)
+    sections = []
+    if outcomes:
+        sections.append("\n".join(outcomes))
+
+    if len(lines) <= MAX_LINES:
+        sections.append("\n".join(lines))
+    else:
+        errors = extract_errors(lines)
+        if errors:
+            sections.append("Errors:\n" + "\n".join(errors))
+        omitted = len(lines) - HEAD_LINES - TAIL_LINES
+        sections.append("\n".join(lines[:HEAD_LINES] + [f"... {omitted} lines omitted ..."] + lines[-TAIL_LINES:]))
+
+    distilled = "\n\n".join(section for section in sections if section)
+    return distilled, bytes_in, len(distilled.encode("utf-8", errors="replace"))
+
+def should_distill(tool, result, command=""):
+    """Distill run_project output, and run_command output that is large or from an install/server command"""
+    if not ENABLED or tool not in DISTILLED_TOOLS or not isinstance(result, str):
+        return False
+    if tool == "run_command":
+        noisy = isinstance(command, str) and _NOISY_COMMAND_PATTERN.search(command)
+        return bool(noisy) or len(result.encode("utf-8", errors="replace")) > MIN_DISTILL_BYTES
+    return True
+
+def distill_tool_result(tool, result, command=""):
+    """Distill a tool result for the conversation, reporting before/after bytes"""
+    if not should_distill(tool, result, command):
+        return result
+
+    # The tool's own status line stays first, so failures still read as failures
+    status_line, body = "", result
+    if result.lstrip().startswith(_STATUS_PREFIXES):
+        status_line, _, body = result.lstrip().partition("\n")
+
+    distilled, _, _ = distill(body)
+    if status_line:
+        distilled = f"{status_line}\n{distilled}" if distilled else status_line
+    bytes_in = len(result.encode("utf-8", errors="replace"))
+    bytes_out = len(distilled.encode("utf-8", errors="replace"))
+    if bytes_out >= bytes_in:
+        return result
+
+    _stats["calls"] += 1
+    _stats["bytes_in"] += bytes_in
+    _stats["bytes_out"] += bytes_out
+    print(f"🧹 Distilled {tool} output: {bytes_in} → {bytes_out} bytes")
+    return distilled
+
+def get_distill_stats():
+    """Return cumulative distillation stats"""
+    return dict(_stats)
@@ -1,9 +1,23 @@
+import asyncio
+import contextvars
 import json
+import os
 import re
+import sys
+import threading
+import time
+from collections import deque
 from dotenv import load_dotenv
 from openai import OpenAI
-from system_prompt import get_optimized_prompt, SYSTEM_PROMPT
+from system_prompt import get_optimized_prompt, get_prompt_report, get_last_prompt_report, format_prompt_report, SYSTEM_PROMPT
 from tools import TOOL_REGISTRY
+from task_processes import set_task_processes, stop_task_processes
+import trace_cache
+import snapshots
+import log_distiller
+import model_router
+import workspace_manifest
+import workspace_paths
 
 load_dotenv()
 
@@ -91,6 +105,42 @@ def execute_tool(tool_name, input_data):
         print(f"   Input type: {type(input_data)}")
         return error_msg
 
+def create_completion(context, messages):
+    """Create a JSON chat completion with the model picked by the router"""
+    model, reason = model_router.route(context)
+    print(f"🧭 Model: {model} ({reason})")
+    
+    started = time.time()
+    response = client.chat.completions.create(
+        model=model,
+        response_format={"type": "json_object"},
+        messages=messages
+    )
+    usage = getattr(response, "usage", None)
+    model_router.record_call(model, time.time() - started, usage.total_tokens if usage else 0)
+    
+    return response, model
+
+def step_failed(result):
+    """Check whether a tool result means the step failed (used to escalate models)"""
+    text = str(result)
+    return (
+        trace_cache.is_failed_result(text)
+        or "Traceback (most recent call last)" in text
+        or "npm ERR!" in text
+        or "🔎 Verification failed" in text
+    )
+
+def model_input_error(result):
+    """Check whether a tool result blames the model's own call (unknown tool or bad arguments)"""
+    text = str(result)
+    return (
+        (text.startswith("Tool '") and "not found" in text)
+        or text.startswith("Error executing tool")
+        or text.startswith("❌ Command validation failed")
+        or text.startswith("❌ Unknown ")
+    )
+
 def summarize_steps(conversation_history, user_query):
     """Summarize multiple steps into a single step to optimize token usage"""
     summary_prompt = f"""
@@ -122,41 +172,202 @@ def summarize_steps(conversation_history, user_query):
     """
     
     try:
-        response = client.chat.completions.create(
-            model="gpt-4.1",
-            response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": "You are an efficient task optimizer. Create simple, reliable single steps. Avoid complex multi-step commands."},
-                {"role": "user", "content": summary_prompt}
-            ]
-        )
+        response, _ = create_completion({"purpose": "summary"}, [
+            {"role": "system", "content": "You are an efficient task optimizer. Create simple, reliable single steps. Avoid complex multi-step commands."},
+            {"role": "user", "content": summary_prompt}
+        ])
         
         return parse_json_response(response.choices[0].message.content)
     except Exception as e:
         print(f"Error in summarization: {e}")
         return None
 
-def process_user_query(user_query, conversation_history=None):
-    """Process user query step by step until OUTPUT is reached"""
+def adjust_trace_actions(cached_query, user_query, actions):
+    """Use a single LLM call to adapt a cached trace (names, paths) to a new query"""
+    adjust_prompt = f"""
+    These tool actions completed this request successfully:
+    Original request: "{cached_query}"
+    
+    Actions:
+    {json.dumps(actions, indent=2)}
+    
+    Adapt them for this new request: "{user_query}"
+    Only change parameters such as project names, file names, labels and entity names.
+    Keep the same number of actions, the same tools and the same order.
+    
+    Return in JSON format:
+    {{"actions":[{{"tool":"tool_name","input":"input_or_dict"}}]}}
+    """
+    
+    try:
+        response, _ = create_completion({"purpose": "adjust"}, [
+            {"role": "system", "content": "You adapt recorded tool actions to a new request. Change parameters only."},
+            {"role": "user", "content": adjust_prompt}
+        ])
+        
+        parsed = parse_json_response(response.choices[0].message.content)
+        adjusted = parsed.get("actions") if parsed else None
+        
+        # Only accept the same shape of trace, otherwise replay it unchanged
+        if (
+            isinstance(adjusted, list)
+            and len(adjusted) == len(actions)
+            and all(
+                isinstance(new, dict) and new.get("tool") == old["tool"]
+                for new, old in zip(adjusted, actions)
+            )
+        ):
+            return adjusted
+        print("⚠️  Adjusted trace changed its shape, replaying the cached trace as-is")
+    except Exception as e:
+        print(f"Error adjusting cached trace: {e}")
+    
+    return actions
+
+# Tools that don't change the workspace (rollback snapshots by itself)
+UNSNAPSHOTTED_TOOLS = {"read_file", "search_code", "open_browser", "rollback"}
+# Tools kept out of cached traces: lookups and measurements don't need replaying,
+# and rollback ids only mean something in the session that took the snapshots
+UNTRACED_TOOLS = {"read_file", "search_code", "benchmark_endpoint", "profile_project", "rollback"}
+
+def replay_cached_trace(user_query, conversation_history, workspace):
+    """Replay a stored trace for the same query (or one with a renamed entity)
+    without the LLM loop.
+    
+    Returns (success, conversation_history) on a hit, or None when the
+    query should go through the normal step loop.
+    """
+    match = trace_cache.find_similar_trace(user_query, workspace)
+    if not match:
+        return None
+    
+    trace_id, entry, similarity = match
+    actions = [action for action in entry["actions"] if action.get("tool") not in UNTRACED_TOOLS]
+    if not actions:
+        return None
+    print(f"♻️  Found cached trace ({similarity:.0%} similar): {entry['query'][:50]}")
+    
+    if trace_cache.normalize_query(user_query) != entry["normalized"] and trace_cache.ADJUST_WITH_LLM:
+        print("🪄 Adjusting cached trace for the new query...")
+        actions = adjust_trace_actions(entry["query"], user_query, actions)
+    
+    for index, action in enumerate(actions, 1):
+        tool = action.get("tool", "")
+        input_data = action.get("input", "")
+        print(f"\n--- Replay {index}/{len(actions)} ---")
+        result = execute_tool(tool, input_data)
+        print(f"Tool result: {result}")
+        
+        if trace_cache.is_failed_result(result):
+            print("⚠️  Cached trace failed to replay, falling back to the normal workflow...")
+            trace_cache.record_replay(False)
+            trace_cache.discard_trace(trace_id)
+            return None
+    
+    trace_cache.record_replay(True)
+    output = entry["output"]
+    print(f"\n✅ Task completed from cached trace! Final output: {output}")
+    
+    server_instructions = get_server_instructions(user_query, conversation_history)
+    if server_instructions:
+        print(f"\n🚀 {server_instructions}")
+    
+    conversation_history.extend([
+        {"role": "user", "content": user_query},
+        {"role": "assistant", "content": json.dumps({"step": "OUTPUT", "tool": "", "input": "", "content": output})}
+    ])
+    return True, conversation_history
+
+def take_step_snapshot(step_number, tool):
+    """Snapshot the workspace before a step's tool runs; returns the id or None"""
+    if not snapshots.ENABLED or tool in UNSNAPSHOTTED_TOOLS:
+        return None
+    try:
+        return snapshots.take_snapshot(f"before step {step_number}: {tool}")
+    except Exception as e:
+        print(f"⚠️  Snapshot failed: {e}")
+        return None
+
+def snapshot_note(snapshot_id):
+    """Tell the model which snapshot restores the state before this step"""
+    return f" (rollback {snapshot_id} restores the state before this step)" if snapshot_id else ""
+
+_ROLLED_BACK_PATTERN = re.compile(r"^✅ Rolled back to snapshot #(\d+)")
+
+def rewind_trace(result, trace_actions, trace_lengths):
+    """Drop the traced actions a successful rollback undid.
+    
+    trace_lengths maps each snapshot taken in this run to the trace length at
+    that point. Returns False when the restored snapshot predates the run, in
+    which case the trace no longer describes how the workspace got its state.
+    """
+    match = _ROLLED_BACK_PATTERN.match(result)
+    if not match:
+        return True
+    length = trace_lengths.get(int(match.group(1)))
+    if length is None:
+        return False
+    del trace_actions[length:]
+    return True
+
+def process_user_query(user_query, conversation_history=None, cancel_event=None, on_event=None):
+    """Process user query step by step until OUTPUT is reached
+    
+    cancel_event (threading.Event) stops the task at the next step boundary;
+    on_event(kind, data) receives compact progress events for the REPL.
+    """
     if conversation_history is None:
         conversation_history = []
     
+    def emit(kind, **data):
+        if on_event:
+            on_event(kind, data)
+    
+    # Replay a stored trace for near-duplicate queries (no LLM loop). A trace is
+    # only valid from the workspace state it was recorded in, so lookups and
+    # stores are keyed on the workspace contents at the start of the query.
+    cacheable = trace_cache.ENABLED
+    if cacheable:
+        workspace_state = workspace_manifest.fingerprint()
+        replayed = replay_cached_trace(user_query, conversation_history, workspace_state)
+        if replayed:
+            emit("output", content="Replayed cached trace")
+            return replayed
+    
     # Get optimized prompt based on user query (ONLY ONCE at the beginning)
     print("🎯 Analyzing user query and selecting optimal prompt...")
     optimized_prompt = get_optimized_prompt(user_query)
     print("✅ Prompt optimization complete!")
     
+    # Tell the model what's already on disk (and what changed) instead of rediscovering it
+    user_content = user_query
+    if workspace_manifest.ENABLED:
+        workspace_context = workspace_manifest.query_context()
+        if workspace_context:
+            print(f"🗂️  Injecting workspace manifest ({len(workspace_context)} characters)")
+            user_content = f"{workspace_context}\n\nUser request: {user_query}"
+    
     messages = [
         {"role": "system", "content": optimized_prompt},
         *conversation_history,
-        {"role": "user", "content": user_query}
+        {"role": "user", "content": user_content}
     ]
     
+    trace_actions = []  # Successful tool calls, stored in the trace cache on OUTPUT
+    trace_lengths = {}  # Snapshot id -> len(trace_actions) when it was taken (see rewind_trace)
+    scenario = (get_prompt_report(user_query) or {}).get("scenario")
+    previous_tool = None
+    last_step_failed = False
     step_count = 0
     max_steps = 30  # Increased to prevent premature stopping
     steps_to_summarize = 10  # Threshold for summarization
     
     while step_count < max_steps:
+        if cancel_event and cancel_event.is_set():
+            print(f"🛑 Task cancelled before step {step_count + 1}")
+            emit("cancelled", step=step_count + 1)
+            return False, conversation_history
+        
         try:
             # Check if we need to summarize steps
             if step_count >= steps_to_summarize and step_count % steps_to_summarize == 0:
@@ -177,8 +388,18 @@ def process_user_query(user_query, conversation_history=None):
                     
                     if step == "SUMMARY" and tool:
                         print(f"\n🚀 Executing summary step: {tool}")
+                        emit("step", step=step_count + 1, phase=step, tool=tool)
+                        snapshot_id = take_step_snapshot(step_count + 1, tool)
+                        if snapshot_id:
+                            trace_lengths[snapshot_id] = len(trace_actions)
                         result = execute_tool(tool, input_data)
                         print(f"✅ Summary step completed: {result}")
+                        failed = trace_cache.is_failed_result(result)
+                        if tool == "rollback":
+                            cacheable = rewind_trace(result, trace_actions, trace_lengths) and cacheable
+                        result = log_distiller.distill_tool_result(tool, result, input_data)
+                        if tool not in UNTRACED_TOOLS and not failed:
+                            trace_actions.append({"tool": tool, "input": input_data})
                         
                         # Add summarized result to conversation
                         summarized_message = {
@@ -189,7 +410,7 @@ def process_user_query(user_query, conversation_history=None):
                         
                         tool_result_message = {
                             "role": "user", 
-                            "content": f"Summary of last {steps_to_summarize} steps completed successfully. Result: {result}"
+                            "content": f"Summary of last {steps_to_summarize} steps completed successfully. Result: {result}{snapshot_note(snapshot_id)}"
                         }
                         messages.append(tool_result_message)
                         
@@ -203,11 +424,13 @@ def process_user_query(user_query, conversation_history=None):
                     print(f"⚠️  Failed to create summarized step, continuing normally...")
             
             # Get response from OpenAI (using the same optimized prompt throughout)
-            response = client.chat.completions.create(
-                model="gpt-4.1",
-                response_format={"type": "json_object"},
-                messages=messages
-            )
+            response, model = create_completion({
+                "purpose": "step",
+                "scenario": scenario,
+                "previous_tool": previous_tool,
+                "error": last_step_failed,
+                "step_count": step_count,
+            }, messages)
             
             response_content = response.choices[0].message.content
             print(f"\n--- Step {step_count + 1} ---")
@@ -216,11 +439,18 @@ def process_user_query(user_query, conversation_history=None):
             # Parse the JSON response
             parsed_response = parse_json_response(response_content)
             if not parsed_response:
+                model_router.record_failure(model)
+                if model != model_router.LARGE_MODEL:
+                    print("Failed to parse response, retrying with the large model...")
+                    last_step_failed = True
+                    step_count += 1
+                    continue
                 print("Failed to parse response, stopping...")
                 break
             
             # Add AI response to conversation
             messages.append({"role": "assistant", "content": response_content})
+            last_step_failed = False
             
             # Check the step
             step = parsed_response.get("step", "").upper()
@@ -232,23 +462,44 @@ def process_user_query(user_query, conversation_history=None):
             print(f"Tool: {tool}")
             print(f"Input: {input_data}")
             print(f"Content: {content}")
+            emit("step", step=step_count + 1, phase=step, tool=tool)
             
             # If it's an ACTION step, execute the tool
             if step == "ACTION" and tool:
+                if cancel_event and cancel_event.is_set():
+                    continue  # Cancelled while waiting for the model; reported at the top
                 print(f"\nExecuting tool: {tool}")
+                snapshot_id = take_step_snapshot(step_count + 1, tool)
+                if snapshot_id:
+                    trace_lengths[snapshot_id] = len(trace_actions)
                 result = execute_tool(tool, input_data)
                 print(f"Tool result: {result}")
+                last_step_failed = step_failed(result)
+                previous_tool = tool
+                # Failing installs or network errors aren't the model's fault
+                if model_input_error(result):
+                    model_router.record_failure(model)
+                failed = trace_cache.is_failed_result(result)
+                if tool == "rollback":
+                    cacheable = rewind_trace(result, trace_actions, trace_lengths) and cacheable
+                result = log_distiller.distill_tool_result(tool, result, input_data)
+                if tool not in UNTRACED_TOOLS and not failed:
+                    trace_actions.append({"tool": tool, "input": input_data})
                 
                 # Add tool result to conversation
                 tool_result_message = {
                     "role": "user", 
-                    "content": f"Tool '{tool}' executed with input '{input_data}'. Result: {result}"
+                    "content": f"Tool '{tool}' executed with input '{input_data}'. Result: {result}{snapshot_note(snapshot_id)}"
                 }
                 messages.append(tool_result_message)
             
             # If it's OUTPUT step, we're done
             elif step == "OUTPUT":
                 print(f"\n✅ Task completed! Final output: {content}")
+                emit("output", content=content)
+                
+                if cacheable:
+                    trace_cache.store_trace(user_query, trace_actions, content, workspace_state)
                 
                 # Add server instructions if relevant
                 server_instructions = get_server_instructions(user_query, conversation_history)
@@ -280,18 +531,52 @@ def show_available_tools():
     
     tools_info = {
         "run_command": "Execute any shell command (cross-platform)",
-        "write_file": "Write content to a file",
+        "write_file": "Write content to a file (verified for syntax/config errors)",
         "read_file": "Read file contents", 
         "open_browser": "Open URL in browser",
-        "run_project": "Automatically detect and run any project (React, FastAPI, Django, Node.js, Python)"
+        "run_project": "Automatically detect and run any project (React, FastAPI, Django, Node.js, Python, full-stack)",
+        "search_code": "Find where identifiers are defined/used (file:line snippets)",
+        "rollback": "Restore the workspace to a snapshot taken before an earlier step",
+        "benchmark_endpoint": "Load-test a running server (throughput, p50/p95/p99 latency, errors)",
+        "profile_project": "Profile a Python project: top cumulative hotspots and allocation sites"
     }
     
     for tool, description in tools_info.items():
         print(f"  • {tool}: {description}")
     
-    print("\n💡 These 5 tools can handle any development task efficiently!")
+    print(f"\n💡 These {len(tools_info)} tools can handle any development task efficiently!")
     print("🚀 The run_project tool automatically detects and starts your project!")
 
+def show_cache_stats():
+    """Display trace cache size and hit-rate statistics"""
+    stats = trace_cache.get_cache_stats()
+    print("\n♻️  Trace Cache:")
+    print("=" * 50)
+    print(f"  • Entries: {stats['entries']}/{stats['max_entries']}")
+    print(f"  • Lookups: {stats['lookups']} (hits: {stats['hits']}, hit rate: {stats['hit_rate']:.0%})")
+    print(f"  • Replays: {stats['replays_ok']} succeeded, {stats['replays_failed']} failed")
+
+def show_distill_stats():
+    """Display how much tool output the log distiller kept out of the context"""
+    stats = log_distiller.get_distill_stats()
+    saved = stats["bytes_in"] - stats["bytes_out"]
+    print("\n🧹 Log Distiller:")
+    print("=" * 50)
+    print(f"  • Distilled results: {stats['calls']}")
+    print(f"  • Bytes: {stats['bytes_in']} → {stats['bytes_out']} "
+          f"(saved {saved}, {saved / stats['bytes_in'] if stats['bytes_in'] else 0:.0%})")
+
+def show_model_metrics():
+    """Display per-model call counts, failure rate, latency and tokens"""
+    metrics = model_router.get_model_metrics()
+    print("\n🧭 Model Routing:")
+    print("=" * 50)
+    if not metrics:
+        print("  No model calls yet.")
+    for model, stats in metrics.items():
+        print(f"  • {model}: {stats['calls']} calls, {stats['failure_rate']:.0%} failed, "
+              f"{stats['avg_latency']:.1f}s avg, {stats['tokens']} tokens")
+
 def get_server_instructions(user_query, conversation_history):
     """Generate server instructions based on the project type and conversation history"""
     
@@ -334,8 +619,9 @@ def get_server_instructions(user_query, conversation_history):
     # Check for full-stack projects
     elif any(word in query_lower for word in ['fullstack', 'full-stack', 'both frontend and backend']):
         return """Your full-stack app is ready! To run it:
-1. Backend: Navigate to backend directory and run the server
-2. Frontend: Navigate to frontend directory and run npm start
+1. From the project root, use the run_project tool with "fullstack"
+   (installs and starts backend and frontend in parallel)
+2. Or by hand: start the backend server, then run npm start in the frontend directory
 3. Check the console output for server URLs"""
     
     # Check for Python scripts
@@ -349,48 +635,298 @@ def get_server_instructions(user_query, conversation_history):
     else:
         return """Your project is ready! Check the files created above and run the appropriate commands to start your application."""
 
-def main():
-    """Main function to handle user interaction"""
-    print("🤖 AI Development Assistant - Optimized Task Processor")
-    print("=" * 60)
-    print("💡 Workflow: ANALYZE → THINK → ACTION → RESULT → OBSERVE → OUTPUT")
-    print("💡 Token optimization: AI-powered prompt selection + step summarization")
-    print("💡 Smart summarization: Summary of last 10 steps (SUMMARY step)")
-    print("💡 Type 'tools' to see all available tools")
-    print("💡 Type 'quit' to exit")
+# ============================================================================
+# 💬 Interactive REPL - queued, cancellable and (optionally) parallel tasks
+# ============================================================================
+
+MAX_PARALLEL_TASKS = 2          # Independent ("&"-prefixed) tasks that may run at once
+TASK_LOG_DIR = workspace_paths.TASK_LOG_DIR  # Full verbose output of each task
+SHUTDOWN_TIMEOUT = 10           # Seconds 'quit' waits for cancelled tasks
+
+# Log file of the running task, so task threads don't flood the console. A context
+# variable, so worker threads a tool starts can inherit it (see tools.run_fullstack_project)
+_task_log = contextvars.ContextVar("task_log", default=None)
+_console = sys.stdout
+_console_lock = threading.Lock()
+
+class TaskRoutedStdout:
+    """stdout that sends prints from task threads to their log file"""
     
-    conversation_history = []
+    def __init__(self, console):
+        self.console = console
+    
+    def _target(self):
+        return _task_log.get() or self.console
+    
+    def write(self, text):
+        return self._target().write(text)
+    
+    def flush(self):
+        self._target().flush()
+    
+    def __getattr__(self, name):
+        return getattr(self.console, name)
+
+def console_print(message):
+    """Print to the console, even from a task thread"""
+    with _console_lock:
+        _console.write(f"{message}\n")
+        _console.flush()
+
+def run_builtin_command(command):
+    """Handle informational commands; returns False if it isn't one"""
+    command = command.lstrip("/").lower()
+    
+    if command == 'tools':
+        show_available_tools()
+    elif command == 'cache':
+        show_cache_stats()
+    elif command == 'models':
+        show_model_metrics()
+    elif command == 'distill':
+        show_distill_stats()
+    elif command == 'snapshots':
+        print(snapshots.list_snapshots())
+    elif command.startswith('rollback '):
+        TOOL_REGISTRY["rollback"](command.split(maxsplit=1)[1])  # Prints its result
+    elif command == 'prompt':
+        report = get_last_prompt_report()
+        print(format_prompt_report(report) if report else "No prompt compiled yet.")
+    else:
+        return False
+    return True
+
+def on_task_event(task, kind, data):
+    """Show a compact progress line for a task event"""
+    if kind == "step":
+        task["step"] = data["step"]
+        task["tool"] = data.get("tool") or ""
+        console_print(f"  [#{task['id']}] step {data['step']}: {data['phase']} {task['tool']}".rstrip())
+    elif kind == "output":
+        console_print(f"  [#{task['id']}] ✅ {str(data['content'])[:120]}")
+    elif kind == "cancelled":
+        console_print(f"  [#{task['id']}] 🛑 cancelled before step {data['step']}")
+
+def run_task_in_thread(task, history):
+    """Run one query with its verbose output going to the task log"""
+    os.makedirs(TASK_LOG_DIR, exist_ok=True)
+    with open(task["log_file"], "w", encoding="utf-8") as log:
+        _task_log.set(log)
+        set_task_processes(task["processes"])
+        try:
+            return process_user_query(
+                task["query"], history,
+                cancel_event=task["cancel"],
+                on_event=lambda kind, data: on_task_event(task, kind, data)
+            )
+        finally:
+            _task_log.set(None)
+            set_task_processes(None)
+
+async def run_in_daemon_thread(function, *args):
+    """Like asyncio.to_thread, but a thread stuck in a task can't keep 'quit' from exiting"""
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    
+    def deliver(result, error):
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    
+    def runner():
+        try:
+            result, error = function(*args), None
+        except Exception as e:
+            result, error = None, e
+        try:
+            loop.call_soon_threadsafe(deliver, result, error)
+        except RuntimeError:
+            pass  # The REPL already exited
+    
+    threading.Thread(target=runner, daemon=True).start()
+    return await future
+
+async def run_task(task, state):
+    """Run a task in a worker thread and merge its result into the shared history"""
+    base_history = list(state["history"])
+    try:
+        success, history = await run_in_daemon_thread(run_task_in_thread, task, list(base_history))
+    except Exception as e:
+        console_print(f"  [#{task['id']}] ❌ {e}")
+        success, history = False, base_history
+    
+    if success:
+        state["history"].extend(history[len(base_history):])
+    state["running"].pop(task["id"], None)
+    state["finished"] += 1
+    
+    elapsed = time.time() - task["started"]
+    if task["cancel"].is_set():
+        status = "🛑 Cancelled"
+    elif success:
+        status = "🎉 Completed"
+    else:
+        status = "⚠️  Stopped"
+    console_print(f"{status} [#{task['id']}] {task['query'][:50]} ({elapsed:.0f}s, log: {task['log_file']})")
+    start_pending_tasks(state)
+
+def start_pending_tasks(state):
+    """Start queued tasks in order: a normal task waits for the previous ones,
+    independent tasks run alongside each other up to MAX_PARALLEL_TASKS"""
+    while state["pending"]:
+        task = state["pending"][0]
+        running = state["running"].values()
+        if task["independent"]:
+            can_start = len(running) < MAX_PARALLEL_TASKS and all(other["independent"] for other in running)
+        else:
+            can_start = not running
+        if not can_start:
+            break
+        
+        state["pending"].popleft()
+        task["started"] = time.time()
+        state["running"][task["id"]] = task
+        task["future"] = asyncio.create_task(run_task(task, state))
+        console_print(f"▶️  [#{task['id']}] Started: {task['query'][:60]}")
+
+def show_status(state):
+    """Show running tasks with their current step"""
+    if not state["running"]:
+        print(f"💤 No running tasks ({state['finished']} finished, {len(state['pending'])} queued)")
+        return
+    print("🏃 Running:")
+    for task in state["running"].values():
+        elapsed = time.time() - task["started"]
+        cancelling = " (cancelling)" if task["cancel"].is_set() else ""
+        print(f"  #{task['id']}  step {task['step']} {task['tool']}  {elapsed:.0f}s  {task['query'][:50]}{cancelling}")
+
+def show_queue(state):
+    """Show queued tasks"""
+    if not state["pending"]:
+        print("📭 Queue is empty")
+        return
+    print("📥 Queued:")
+    for task in state["pending"]:
+        mode = " (independent)" if task["independent"] else ""
+        print(f"  #{task['id']}  {task['query'][:60]}{mode}")
+
+def cancel_tasks(state, argument):
+    """Cancel a queued or running task by id, or all running tasks"""
+    if argument:
+        task_id = int(argument.lstrip("#")) if argument.lstrip("#").isdigit() else None
+        for task in list(state["pending"]):
+            if task["id"] == task_id:
+                state["pending"].remove(task)
+                print(f"🗑️  Removed queued task #{task_id}")
+                return
+        targets = [task for task in state["running"].values() if task["id"] == task_id]
+        if not targets:
+            print(f"❌ No queued or running task #{argument}")
+            return
+    else:
+        targets = list(state["running"].values())
+        if not targets:
+            print("💤 Nothing is running")
+            return
+    
+    for task in targets:
+        task["cancel"].set()
+        stopped = stop_task_processes(task["processes"])
+        detail = f"stopped {stopped} running command(s)" if stopped else "stops after its current step"
+        print(f"🛑 Cancelling task #{task['id']} ({detail})")
+
+async def run_repl():
+    """Read queries without blocking on running tasks"""
+    state = {"history": [], "pending": deque(), "running": {}, "next_id": 1, "finished": 0}
     
     while True:
-        # Get user query
-        user_query = input("\n💬 Enter your query: ").strip()
+        try:
+            user_query = (await asyncio.to_thread(input, "\n💬 Enter your query: ")).strip()
+        except EOFError:
+            user_query = "quit"
+        
+        command, _, argument = user_query.partition(" ")
+        command = command.lower()
         
-        if user_query.lower() in ['quit', 'exit', 'q']:
+        if command in ['quit', 'exit', 'q', '/quit']:
+            state["pending"].clear()
+            for task in state["running"].values():
+                task["cancel"].set()
+                stop_task_processes(task["processes"])
+            futures = [task["future"] for task in state["running"].values()]
+            if futures:
+                print(f"⏳ Waiting up to {SHUTDOWN_TIMEOUT}s for running steps to finish...")
+                _, still_running = await asyncio.wait(futures, timeout=SHUTDOWN_TIMEOUT)
+                if still_running:
+                    print(f"⚠️  Exiting without {len(still_running)} unfinished task(s)")
             print("👋 Goodbye!")
             break
         
-        if user_query.lower() == 'tools':
-            show_available_tools()
+        if command == '/status':
+            show_status(state)
             continue
         
-        if not user_query:
-            print("Please enter a valid query.")
+        if command == '/queue':
+            show_queue(state)
             continue
         
-        print(f"\n🔄 Processing: {user_query}")
-        print("=" * 60)
+        if command == '/cancel':
+            cancel_tasks(state, argument.strip())
+            continue
         
-        # Process the query
-        success, conversation_history = process_user_query(user_query, conversation_history)
+        if run_builtin_command(user_query):
+            continue
         
-        if success:
-            print("\n🎉 Task completed successfully!")
+        independent = user_query.startswith("&")
+        user_query = user_query.lstrip("&").strip()
+        if not user_query:
+            print("Please enter a valid query.")
+            continue
+        
+        task = {
+            "id": state["next_id"],
+            "query": user_query,
+            "independent": independent,
+            "cancel": threading.Event(),
+            "processes": set(),
+            "step": 0,
+            "tool": "",
+            "started": None,
+            "log_file": os.path.join(TASK_LOG_DIR, f"task-{state['next_id']}.log"),
+        }
+        state["next_id"] += 1
+        state["pending"].append(task)
+        print(f"📥 Queued task #{task['id']}: {user_query[:60]}")
+        start_pending_tasks(state)
+
+def main():
+    """Main function to handle user interaction"""
+    global _console
+    print("🤖 AI Development Assistant - Optimized Task Processor")
+    print("=" * 60)
+    print("💡 Workflow: ANALYZE → THINK → ACTION → RESULT → OBSERVE → OUTPUT")
+    print("💡 Token optimization: AI-powered prompt selection + step summarization")
+    print("💡 Smart summarization: Summary of last 10 steps (SUMMARY step)")
+    print("💡 Queries run in the background: keep typing to queue the next one")
+    print(f"💡 Prefix a query with '&' to run it in parallel (independent, up to {MAX_PARALLEL_TASKS})")
+    print("💡 Type '/status', '/queue' or '/cancel [id]' while tasks run")
+    print("💡 Type 'tools' to see all available tools")
+    print("💡 Type 'cache' to see trace cache stats")
+    print("💡 Type 'distill' to see how much tool output was distilled")
+    print("💡 Type 'prompt' to see the token cost of the last system prompt")
+    print("💡 Type 'snapshots' to list snapshots, 'rollback <n>' to restore one")
+    print("💡 Type 'models' to see per-model latency/token metrics")
+    print("💡 Type 'quit' to exit")
+    
+    _console = sys.stdout
+    sys.stdout = TaskRoutedStdout(_console)
+    try:
+        asyncio.run(run_repl())
+    finally:
+        sys.stdout = _console
 
 if __name__ == "__main__":
     main()
-
-
-
-
-
-
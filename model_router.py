@@ -0,0 +1,127 @@
+# ============================================================================
+# 🧭 Model Router - Pick the model per step from scenario, tool and error state
+# ============================================================================
+
+import json
+import os
+
+LARGE_MODEL = os.getenv("LARGE_MODEL", "gpt-4.1")
+SMALL_MODEL = os.getenv("SMALL_MODEL", "gpt-4.1-mini")
+ROUTING_CONFIG_FILE = "model_routing.json"
+
+# Stop using the small model once it fails this often (after MIN_CALLS_FOR_FEEDBACK calls)
+MAX_SMALL_FAILURE_RATE = 0.3
+# Stop using the small model if it isn't meaningfully faster than the large one
+MIN_SMALL_SPEEDUP = 1.2
+MIN_CALLS_FOR_FEEDBACK = 5
+
+# Rules are checked in order; the first whose conditions all match picks the model.
+# Conditions: purpose, scenario, previous_tool (lists), error (bool), step_count_max (int).
+# "model" is "large", "small" or an explicit model name.
+DEFAULT_RULES = [
+    {"name": "planning", "model": "large", "if": {"purpose": ["summary"]}},
+    {"name": "first step", "model": "large", "if": {"purpose": ["step"], "step_count_max": 0}},
+    {"name": "escalate on error", "model": "large", "if": {"error": True}},
+    {"name": "analysis", "model": "large",
+     "if": {"scenario": ["debug", "optimize"],
+            "previous_tool": ["read_file", "search_code", "profile_project", "benchmark_endpoint"]}},
+    {"name": "mechanical step", "model": "small",
+     "if": {"previous_tool": ["run_command", "write_file", "run_project", "open_browser"]}},
+    {"name": "trace adjustment", "model": "small", "if": {"purpose": ["adjust"]}},
+    {"name": "default", "model": "small", "if": {}},
+]
+
+# Loaded lazily from ROUTING_CONFIG_FILE (falls back to DEFAULT_RULES)
+_rules = None
+
+# model -> {"calls", "failures", "latency", "tokens"}
+_metrics = {}
+
+def _load_rules():
+    """Load routing rules from ROUTING_CONFIG_FILE if present"""
+    global _rules, LARGE_MODEL, SMALL_MODEL, MAX_SMALL_FAILURE_RATE
+    if _rules is not None:
+        return _rules
+
+    _rules = DEFAULT_RULES
+    if os.path.exists(ROUTING_CONFIG_FILE):
+        try:
+            with open(ROUTING_CONFIG_FILE, "r", encoding="utf-8") as f:
+                config = json.load(f)
+            _rules = config.get("rules", DEFAULT_RULES)
+            LARGE_MODEL = config.get("large_model", LARGE_MODEL)
+            SMALL_MODEL = config.get("small_model", SMALL_MODEL)
+            MAX_SMALL_FAILURE_RATE = config.get("max_small_failure_rate", MAX_SMALL_FAILURE_RATE)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not load {ROUTING_CONFIG_FILE}, using default routing: {e}")
+    return _rules
+
+def _matches(conditions, context):
+    for key, expected in conditions.items():
+        if key == "step_count_max":
+            if context.get("step_count", 0) > expected:
+                return False
+        elif key == "error":
+            if bool(context.get("error")) != expected:
+                return False
+        elif context.get(key) not in expected:
+            return False
+    return True
+
+def _resolve(model):
+    return {"large": LARGE_MODEL, "small": SMALL_MODEL}.get(model, model)
+
+def small_model_healthy():
+    """Use feedback from recorded metrics to decide whether the small model is worth it"""
+    small = _metrics.get(SMALL_MODEL)
+    if not small or small["calls"] < MIN_CALLS_FOR_FEEDBACK:
+        return True
+    if small["failures"] / small["calls"] > MAX_SMALL_FAILURE_RATE:
+        return False
+
+    large = _metrics.get(LARGE_MODEL)
+    if large and large["calls"] >= MIN_CALLS_FOR_FEEDBACK:
+        small_latency = small["latency"] / small["calls"]
+        large_latency = large["latency"] / large["calls"]
+        if small_latency * MIN_SMALL_SPEEDUP > large_latency:
+            return False
+    return True
+
+def route(context):
+    """Return (model, reason) for a call.
+
+    context keys: purpose ("step", "summary", "adjust"), scenario,
+    previous_tool, error, step_count.
+    """
+    for rule in _load_rules():
+        if _matches(rule.get("if", {}), context):
+            model = _resolve(rule["model"])
+            if model == SMALL_MODEL and not small_model_healthy():
+                return LARGE_MODEL, f"{rule['name']} (small model demoted by metrics)"
+            return model, rule["name"]
+    return LARGE_MODEL, "no rule matched"
+
+def record_call(model, latency, tokens):
+    """Record latency and token usage of one completion"""
+    metrics = _metrics.setdefault(model, {"calls": 0, "failures": 0, "latency": 0.0, "tokens": 0})
+    metrics["calls"] += 1
+    metrics["latency"] += latency
+    metrics["tokens"] += tokens or 0
+
+def record_failure(model):
+    """Record that a model produced an unusable step (bad JSON, unknown tool or bad arguments)"""
+    metrics = _metrics.setdefault(model, {"calls": 0, "failures": 0, "latency": 0.0, "tokens": 0})
+    metrics["failures"] += 1
+
+def get_model_metrics():
+    """Return per-model calls, failure rate, average latency and tokens"""
+    report = {}
+    for model, metrics in _metrics.items():
+        calls = metrics["calls"] or 1
+        report[model] = {
+            "calls": metrics["calls"],
+            "failure_rate": metrics["failures"] / calls,
+            "avg_latency": metrics["latency"] / calls,
+            "tokens": metrics["tokens"],
+        }
+    return report
@@ -0,0 +1,157 @@
+# ============================================================================
+# 🔬 Project Profiler - cProfile/tracemalloc hotspots for generated Python projects
+# ============================================================================
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from task_processes import run_tracked
+
+ENTRY_POINTS = ["main.py", "app.py", "run.py", "server.py"]
+DEFAULT_TIMEOUT = 30            # Seconds before the profiled program is interrupted
+TOP_FUNCTIONS = 15
+TOP_ALLOCATIONS = 10
+
+# Runs in a child process: profile the target, interrupt it on timeout, dump stats as JSON
+_RUNNER = r'''
+import cProfile, importlib, json, os, pstats, runpy, signal, sys, threading, tracemalloc, _thread
+
+target, timeout, output_file, top_functions, top_allocations = sys.argv[1:6]
+timeout, top_functions, top_allocations = float(timeout), int(top_functions), int(top_allocations)
+sys.path.insert(0, os.getcwd())
+sys.argv = [target]
+
+def interrupt():
+    # A real signal also breaks blocking calls like time.sleep(); interrupt_main() doesn't
+    if os.name == "posix":
+        os.kill(os.getpid(), signal.SIGINT)
+    else:
+        _thread.interrupt_main()
+
+status = "ok"
+timer = threading.Timer(timeout, interrupt)
+timer.daemon = True
+profiler = cProfile.Profile()
+tracemalloc.start(1)
+timer.start()
+profiler.enable()
+try:
+    if target.endswith(".py"):
+        runpy.run_path(target, run_name="__main__")
+    else:
+        module_name, function_name = target.split(":")
+        getattr(importlib.import_module(module_name), function_name)()
+except KeyboardInterrupt:
+    status = "timeout"
+except SystemExit as e:
+    status = "ok" if e.code in (None, 0) else f"exit {e.code}"
+except BaseException as e:
+    status = f"error: {type(e).__name__}: {e}"
+finally:
+    profiler.disable()
+    timer.cancel()
+
+snapshot = tracemalloc.take_snapshot()
+_, peak = tracemalloc.get_traced_memory()
+tracemalloc.stop()
+
+skip = ("cProfile", "runpy", "tracemalloc", "threading", "<frozen", "importlib")
+def keep(filename):
+    return filename != "<string>" and not any(part in filename for part in skip)
+
+stats = pstats.Stats(profiler)
+functions = []
+for (filename, line, name), (cc, nc, tt, ct, callers) in stats.stats.items():
+    if keep(filename) and name not in ("<built-in method builtins.exec>", "<method 'disable' of '_lsprof.Profiler' objects>"):
+        functions.append({"file": filename, "line": line, "name": name, "calls": nc,
+                          "self": tt, "cumulative": ct})
+functions.sort(key=lambda item: item["cumulative"], reverse=True)
+
+allocations = []
+for stat in snapshot.statistics("lineno"):
+    frame = stat.traceback[0]
+    if keep(frame.filename):
+        allocations.append({"file": frame.filename, "line": frame.lineno,
+                            "size": stat.size, "count": stat.count})
+    if len(allocations) >= top_allocations:
+        break
+
+with open(output_file, "w") as f:
+    json.dump({"status": status, "peak": peak, "total_time": sum(i["self"] for i in functions),
+               "functions": functions[:top_functions], "allocations": allocations}, f)
+'''
+
+def detect_entry_point():
+    """Return the first Python entry point found in the current directory"""
+    for filename in ENTRY_POINTS:
+        if os.path.exists(filename):
+            return filename
+    return None
+
+def _location(filename, line):
+    """Shorten paths: project files relative to cwd, library files to their last parts"""
+    if filename == "~":
+        return "built-in"
+    cwd = os.getcwd()
+    if filename.startswith(cwd):
+        filename = os.path.relpath(filename, cwd)
+    elif os.sep in filename:
+        filename = os.path.join("…", *filename.split(os.sep)[-2:])
+    return f"{filename}:{line}"
+
+def _format_size(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size} B"
+        size /= 1024
+
+def format_profile(target, data):
+    """Format profile data as a compact table for the model"""
+    lines = [f"🔬 Profile of {target} (status: {data['status']}, "
+             f"profiled time {data['total_time']:.3f}s, peak memory {_format_size(data['peak'])})"]
+
+    lines.append("Top cumulative time:")
+    lines.append("   cum s   self s     calls  function")
+    for item in data["functions"]:
+        lines.append(f"  {item['cumulative']:6.3f}  {item['self']:6.3f}  {item['calls']:8d}  "
+                     f"{item['name']} [{_location(item['file'], item['line'])}]")
+
+    if data["allocations"]:
+        lines.append("Top allocation sites (still allocated at exit):")
+        lines.append("       size    count  location")
+        for item in data["allocations"]:
+            lines.append(f"  {_format_size(item['size']):>9}  {item['count']:7d}  {_location(item['file'], item['line'])}")
+    return "\n".join(lines)
+
+def profile(target="auto", timeout=DEFAULT_TIMEOUT, top=TOP_FUNCTIONS):
+    """Profile a script ("main.py") or function ("module:function") in a child process"""
+    if target in (None, "", "auto"):
+        target = detect_entry_point()
+        if not target:
+            return f"❌ No entry point found ({', '.join(ENTRY_POINTS)}). Pass a file or 'module:function'."
+    elif not target.endswith(".py") and ":" not in target:
+        return "❌ Target must be a .py file or 'module:function'"
+    elif target.endswith(".py") and not os.path.exists(target):
+        return f"❌ {target} not found"
+
+    timeout, top = int(timeout), int(top)
+    fd, output_file = tempfile.mkstemp(suffix=".json", prefix="profile_")
+    os.close(fd)
+    try:
+        # Tracked, so /cancel and quit stop a profiled program that never returns
+        result = run_tracked(
+            [sys.executable, "-c", _RUNNER, target, str(timeout), output_file, str(top), str(TOP_ALLOCATIONS)],
+            timeout=timeout + 30
+        )
+        try:
+            with open(output_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except ValueError:
+            return f"❌ Profiling {target} produced no stats:\n{result.stderr[-1000:]}"
+        return format_profile(target, data)
+    except subprocess.TimeoutExpired:
+        return f"❌ {target} did not stop within {timeout + 30}s, even after being interrupted"
+    finally:
+        os.remove(output_file)
@@ -0,0 +1,226 @@
+# ============================================================================
+# 📸 Workspace Snapshots - Step-boundary snapshots and fast rollback
+# ============================================================================
+
+# Snapshots cover the project files in the working directory, not only the files
+# write_file touched, because run_command scaffolds and edits files too. Excluded:
+# dependency/build/tool directories, secrets (.env, keys), the agent's own source
+# files when it runs inside the workspace, and files over MAX_FILE_SIZE. A workspace
+# with more than MAX_TRACKED_FILES files is not snapshotted at all.
+
+import fnmatch
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import workspace_paths
+
+ENABLED = True
+SNAPSHOT_DIR = workspace_paths.SNAPSHOT_DIR
+SKIP_DIRS = workspace_paths.SKIP_DIRS
+SKIP_FILES = workspace_paths.SKIP_FILES
+MAX_SNAPSHOTS = 50              # Oldest snapshots (and unused blobs) are pruned past this
+MAX_FILE_SIZE = 5 * 1024 * 1024 # Larger files are not tracked
+MAX_TRACKED_FILES = 5000        # Larger workspaces are not snapshotted
+
+# Secrets are never copied into the blob store (or deleted by a rollback)
+SECRET_PATTERNS = [".env", ".env.*", "*.pem", "*.key", "id_rsa*", "id_ed25519*"]
+
+# Loaded lazily from SNAPSHOT_DIR: [{"id", "label", "time", "files": {path: hash}}]
+_snapshots = None
+# path -> (mtime_ns, size, hash) as of the last snapshot, so unchanged files aren't re-hashed
+_last_stat = {}
+# Tasks may run in parallel (see main.run_repl)
+_lock = threading.RLock()
+
+def _blob_dir():
+    return os.path.join(SNAPSHOT_DIR, "blobs")
+
+def _manifest_dir():
+    return os.path.join(SNAPSHOT_DIR, "manifests")
+
+class WorkspaceTooLarge(Exception):
+    pass
+
+def _is_tracked(filename):
+    return filename not in SKIP_FILES and not any(fnmatch.fnmatch(filename, pattern) for pattern in SECRET_PATTERNS)
+
+def _iter_tracked_files(root="."):
+    """Yield workspace files that snapshots track"""
+    agent_files = workspace_paths.agent_files()
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames[:] = [name for name in dirnames if name not in SKIP_DIRS]
+        for filename in filenames:
+            path = os.path.normpath(os.path.join(directory, filename))
+            if _is_tracked(filename) and path not in agent_files:
+                yield path
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _store_blob(path, file_hash):
+    """Copy a file into the content-addressed blob store (once per content)"""
+    blob = os.path.join(_blob_dir(), file_hash)
+    if not os.path.exists(blob):
+        # Copies, not hardlinks: tools rewrite files in place, which would
+        # silently change a hardlinked snapshot too
+        temp_blob = f"{blob}.tmp"
+        shutil.copy2(path, temp_blob)
+        os.replace(temp_blob, blob)
+
+def _load_snapshots():
+    """Load snapshot manifests from disk once per process"""
+    global _snapshots
+    if _snapshots is not None:
+        return _snapshots
+
+    _snapshots = []
+    if os.path.isdir(_manifest_dir()):
+        for name in os.listdir(_manifest_dir()):
+            if name.endswith(".json"):
+                try:
+                    with open(os.path.join(_manifest_dir(), name), "r", encoding="utf-8") as f:
+                        _snapshots.append(json.load(f))
+                except (OSError, ValueError) as e:
+                    print(f"⚠️  Skipping unreadable snapshot {name}: {e}")
+    _snapshots.sort(key=lambda snapshot: snapshot["id"])
+    return _snapshots
+
+def _scan_workspace():
+    """Return {path: hash} for tracked files, hashing and storing only changed ones"""
+    files = {}
+    changed = 0
+    for path in _iter_tracked_files():
+        if len(files) >= MAX_TRACKED_FILES:
+            raise WorkspaceTooLarge(f"more than {MAX_TRACKED_FILES} files")
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        if stat.st_size > MAX_FILE_SIZE:
+            continue
+
+        previous = _last_stat.get(path)
+        if previous and previous[0] == stat.st_mtime_ns and previous[1] == stat.st_size:
+            files[path] = previous[2]
+            continue
+
+        try:
+            file_hash = _hash_file(path)
+            _store_blob(path, file_hash)
+        except OSError:
+            continue
+        _last_stat[path] = (stat.st_mtime_ns, stat.st_size, file_hash)
+        files[path] = file_hash
+        changed += 1
+
+    for path in list(_last_stat):
+        if path not in files:
+            del _last_stat[path]
+    return files, changed
+
+def _prune_snapshots():
+    """Drop the oldest snapshots and any blobs no longer referenced"""
+    snapshots = _load_snapshots()
+    if len(snapshots) <= MAX_SNAPSHOTS:
+        return
+
+    while len(snapshots) > MAX_SNAPSHOTS:
+        oldest = snapshots.pop(0)
+        try:
+            os.remove(os.path.join(_manifest_dir(), f"{oldest['id']}.json"))
+        except OSError:
+            pass
+
+    referenced = {file_hash for snapshot in snapshots for file_hash in snapshot["files"].values()}
+    for blob in os.listdir(_blob_dir()):
+        if blob not in referenced:
+            try:
+                os.remove(os.path.join(_blob_dir(), blob))
+            except OSError:
+                pass
+
+def take_snapshot(label="", prune=True):
+    """Record the current workspace state and return the snapshot id (None if too large)"""
+    with _lock:
+        started = time.time()
+        snapshots = _load_snapshots()
+        os.makedirs(_blob_dir(), exist_ok=True)
+        os.makedirs(_manifest_dir(), exist_ok=True)
+
+        try:
+            files, changed = _scan_workspace()
+        except WorkspaceTooLarge as e:
+            print(f"⚠️  Workspace not snapshotted ({e})")
+            return None
+        if snapshots and snapshots[-1]["files"] == files:
+            return snapshots[-1]["id"]  # Nothing changed since the last snapshot
+
+        snapshot = {
+            "id": snapshots[-1]["id"] + 1 if snapshots else 1,
+            "label": label,
+            "time": time.time(),
+            "files": files,
+        }
+        with open(os.path.join(_manifest_dir(), f"{snapshot['id']}.json"), "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+        snapshots.append(snapshot)
+        if prune:
+            _prune_snapshots()
+
+        elapsed_ms = (time.time() - started) * 1000
+        print(f"📸 Snapshot #{snapshot['id']} ({len(files)} files, {changed} changed, {elapsed_ms:.0f}ms)")
+        return snapshot["id"]
+
+def list_snapshots():
+    """Return a compact listing of available snapshots"""
+    with _lock:
+        snapshots = _load_snapshots()
+        if not snapshots:
+            return "No snapshots yet."
+        lines = ["📸 Snapshots:"]
+        for snapshot in snapshots[-15:]:
+            when = time.strftime("%H:%M:%S", time.localtime(snapshot["time"]))
+            lines.append(f"  #{snapshot['id']}  {when}  {len(snapshot['files'])} files  {snapshot['label']}")
+        return "\n".join(lines)
+
+def rollback(step):
+    """Restore tracked files to the state recorded in snapshot `step`"""
+    with _lock:
+        try:
+            step = int(str(step).lstrip("#"))
+        except ValueError:
+            return f"❌ Invalid snapshot id: {step}"
+
+        target = next((snapshot for snapshot in _load_snapshots() if snapshot["id"] == step), None)
+        if target is None:
+            return f"❌ Snapshot #{step} not found.\n{list_snapshots()}"
+
+        # Snapshot first so the rollback itself can be undone (without pruning the target)
+        undo_id = take_snapshot(f"before rollback to #{step}", prune=False)
+        if undo_id is None:
+            return f"❌ Workspace has more than {MAX_TRACKED_FILES} files, rollback is disabled"
+        current = _load_snapshots()[-1]["files"]
+
+        restored, removed = 0, 0
+        for path, file_hash in target["files"].items():
+            if current.get(path) != file_hash:
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                shutil.copy2(os.path.join(_blob_dir(), file_hash), path)
+                restored += 1
+        for path in current:
+            if path not in target["files"] and os.path.exists(path):
+                os.remove(path)
+                removed += 1
+
+        _last_stat.clear()  # Restored files have new stat info
+        return (f"✅ Rolled back to snapshot #{step}: {restored} files restored, {removed} removed "
+                f"(undo with rollback {undo_id})")
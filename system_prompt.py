@@ -2,7 +2,10 @@
 # 🚀 Optimized System Prompt - Modular & Token-Efficient
 # ============================================================================
 
+import hashlib
 import json
+import os
+import re
 from openai import OpenAI
 from dotenv import load_dotenv
 
@@ -20,21 +23,27 @@ BASE_PROMPT = """You are an AI Development Assistant. Follow this workflow:
 
 Always respond with exactly one JSON: {"step":"<PHASE>","tool":"<TOOL>","input":"<INPUT_or_DICT>","content":"<NOTES>"}
 
-Available tools: run_command, write_file, read_file, open_browser, run_project
+Available tools: run_command, write_file, read_file, open_browser, run_project, search_code, rollback, benchmark_endpoint, profile_project
 
 Tool input formats:
 - run_command: "command string"
 - write_file: {"filename":"file.txt","content":"file content"}
 - read_file: {"filename":"file.txt"}
 - open_browser: {"url":"http://example.com"}
-- run_project: "auto" or "react" or "fastapi" or "django" or "node" or "python"
+- run_project: "auto" or "react" or "fastapi" or "django" or "node" or "python" or "fullstack"
+- search_code: "identifier_or_text" or {"query":"name","kind":"definition" or "usage" or "all"}
+- rollback: "<snapshot number>" or "list" (restore files from before a step that broke the project)
+- benchmark_endpoint: "http://localhost:8000/" or {"url":"http://localhost:8000/items","concurrency":10,"duration":10,"requests":[{"method":"GET","path":"/items","weight":3},{"method":"POST","path":"/items","body":{"name":"x"}}]}
+- profile_project: "auto" or "script.py" or "module:function" or {"target":"main.py","timeout":30}
 
 Key Rules:
 - Be efficient: Use fewest steps possible
 - Be cross-platform: Commands work on Windows/Mac/Linux
 - Be helpful: Provide clear explanations
 - Analyze first: Understand scope before acting
+- Use the workspace manifest in the request instead of listing or re-reading files you don't need
 - Use appropriate tools for the task
+- If a step breaks a working project, rollback to the snapshot before it instead of patching
 - Provide clear feedback for file creation and server setup
 - Always tell user how to run the project locally
 - Show file creation status (success/error) like Cursor does
@@ -82,6 +91,7 @@ SCENARIO_PROMPTS = {
 - Use: npm init -y for package.json
 - Install dependencies only when needed
 - Use Express.js for web servers
+- Listen on process.env.PORT (run_project sets PORT=5000): app.listen(process.env.PORT || 5000)
 - Provide npm install and start instructions
 - Show server URL in output
 - Use run_project tool to automatically start Node.js server
@@ -89,28 +99,33 @@ SCENARIO_PROMPTS = {
     
     "fullstack": """Full-Stack App Creation:
 - Frontend: React/Vue with Vite
-- Backend: FastAPI/Django/Express
+- Backend: FastAPI/Django/Express (Express listens on process.env.PORT, set to 5000)
 - Database: SQLite for simple apps
 - Use separate directories for frontend/backend
 - Provide instructions for both servers
 - Show both server URLs
-- Use run_project tool to start backend, then frontend
+- Use run_project tool with "fullstack" to install and start both servers in parallel
 - Example: {"step":"ACTION","tool":"run_command","input":"mkdir frontend backend","content":"Creating full-stack project structure"}""",
     
     "debug": """Debugging Guidelines:
+- Use search_code to locate functions/classes (file:line) instead of reading whole files
 - Read existing files first
 - Check error messages carefully
 - Use run_command to test fixes
+- Use profile_project when the problem is slowness or memory use
 - Provide clear error explanations
 - Show file reading status
 - Example: {"step":"ACTION","tool":"read_file","input":{"filename":"app.py"},"content":"Reading file to debug issue"}""",
     
     "optimize": """Performance Optimization:
 - Minimize dependencies
+- Use profile_project to find real hotspots and allocation sites before changing code
+- Use search_code to find hot functions and their call sites
 - Use efficient tools (Vite over CRA)
 - Avoid unnecessary installations
 - Focus on core functionality first
-- Show optimization results
+- Start the server with run_project, then measure with benchmark_endpoint before and after each change
+- Show optimization results (throughput and p95/p99 latency before vs after)
 - Example: {"step":"ACTION","tool":"write_file","input":{"filename":"package.json","content":"{\\"name\\":\\"app\\",\\"dependencies\\":{\\"react\\":\\"^18.2.0\\"}}"},"content":"Creating minimal package.json"}"""
 }
 
@@ -175,49 +190,136 @@ def select_prompt_scenario(user_query):
         print(f"Error in prompt selection: {e}, using generic")
         return "generic"
 
+# ============================================================================
+# 🧮 Prompt Compiler - Tagged fragments fitted to a token budget
+# ============================================================================
+
+# Token budget for the compiled system prompt (override with PROMPT_TOKEN_BUDGET)
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "1200"))
+
+GENERIC_PROMPT = """Generic Development Guidelines:
+- Analyze the user's specific requirements carefully
+- Create appropriate project structure
+- Use best practices for the technology involved
+- Provide clear file creation feedback
+- Set up local development servers when applicable
+- Give clear instructions for running the project
+- Handle errors gracefully and provide helpful messages"""
+
+# Example fragments: (scenario, query keyword, title, QUICK_EXAMPLES key)
+EXAMPLE_TRIGGERS = [
+    ("react", "todo", "Quick Todo Example", "react_todo"),
+    ("python", "calculator", "Quick Calculator Example", "python_calc"),
+    ("fastapi", "api", "Quick API Example", "fastapi_api"),
+]
+
+# Fragments are joined in this tag order, so the same scenario always yields
+# the same bytes and provider-side prefix caching can hit across sessions.
+# Lower priority fragments are dropped first when over budget.
+FRAGMENT_ORDER = ["base", "scenario", "generic", "example"]
+FRAGMENT_PRIORITY = {"base": 0, "scenario": 1, "generic": 2, "example": 3}
+
+_last_prompt_report = None
+
+def estimate_tokens(text):
+    """Approximate BPE token count offline (words ~5 chars/token, symbol runs ~2 chars/token)"""
+    tokens = 0
+    for piece in re.findall(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]+", text):
+        if piece[0].isalpha():
+            tokens += -(-len(piece) // 5)
+        elif piece[0].isdigit():
+            tokens += -(-len(piece) // 3)
+        else:
+            tokens += -(-len(piece) // 2)
+    return tokens
+
+def select_fragments(user_query, selected_scenario):
+    """Return the (tag, name, text) fragments relevant to a query"""
+    fragments = [("base", "base", BASE_PROMPT)]
+    
+    if selected_scenario != "generic" and selected_scenario in SCENARIO_PROMPTS:
+        fragments.append(("scenario", selected_scenario, SCENARIO_PROMPTS[selected_scenario]))
+    else:
+        fragments.append(("generic", "generic", GENERIC_PROMPT))
+    
+    query_lower = user_query.lower()
+    for scenario, keyword, title, example_key in EXAMPLE_TRIGGERS:
+        if keyword in query_lower and selected_scenario == scenario:
+            fragments.append(("example", example_key, f"{title}:\n{QUICK_EXAMPLES[example_key]}"))
+            break
+    
+    return fragments
+
+def compile_prompt(fragments, budget=None):
+    """Assemble fragments in a stable order, dropping optional ones to fit the budget.
+    
+    Returns (prompt, report) where report lists per-fragment token cost.
+    """
+    budget = PROMPT_TOKEN_BUDGET if budget is None else budget
+    ordered = sorted(fragments, key=lambda fragment: FRAGMENT_ORDER.index(fragment[0]))
+    costs = {name: estimate_tokens(text) for _, name, text in ordered}
+    
+    included = list(ordered)
+    total = sum(costs.values())
+    # Drop the lowest priority optional fragments until we fit (base is always kept)
+    for fragment in sorted(ordered, key=lambda fragment: -FRAGMENT_PRIORITY[fragment[0]]):
+        if total <= budget or fragment[0] == "base":
+            break
+        included.remove(fragment)
+        total -= costs[fragment[1]]
+    
+    prompt = "\n\n".join(text for _, _, text in included)
+    report = {
+        "budget": budget,
+        "total_tokens": total,
+        "prefix_hash": hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12],
+        "fragments": [
+            {"tag": tag, "name": name, "tokens": costs[name], "included": (tag, name, text) in included}
+            for tag, name, text in ordered
+        ],
+    }
+    return prompt, report
+
+def format_prompt_report(report):
+    """Format a compiled prompt report as a compact table"""
+    lines = [f"🧮 Prompt: ~{report['total_tokens']}/{report['budget']} tokens (prefix {report['prefix_hash']})"]
+    for fragment in report["fragments"]:
+        status = "✅" if fragment["included"] else "✂️ "
+        lines.append(f"   {status} {fragment['tag']:<9} {fragment['name']:<12} ~{fragment['tokens']} tokens")
+    return "\n".join(lines)
+
+def get_last_prompt_report():
+    """Return the report of the most recently compiled prompt"""
+    return _last_prompt_report
+
+def get_prompt_report(user_query):
+    """Return the report of the prompt compiled for a query, if cached"""
+    cached = _prompt_cache.get(user_query)
+    return cached[1] if cached else None
+
 def get_optimized_prompt(user_query):
     """Generate optimized prompt based on intelligent scenario selection"""
+    global _last_prompt_report
     
     # Check cache first
     if user_query in _prompt_cache:
         print(f"🎯 Using cached prompt for: {user_query[:50]}...")
-        return _prompt_cache[user_query]
+        prompt, _last_prompt_report = _prompt_cache[user_query]
+        return prompt
     
     # Use smaller model to select scenario
     selected_scenario = select_prompt_scenario(user_query)
     
     print(f"🎯 AI selected scenario: {selected_scenario}")
     
-    # Build optimized prompt
-    prompt = BASE_PROMPT
-    
-    # Add relevant scenario prompt if not generic
-    if selected_scenario != "generic" and selected_scenario in SCENARIO_PROMPTS:
-        prompt += f"\n\n{SCENARIO_PROMPTS[selected_scenario]}"
-    else:
-        # Add generic development guidelines for any task
-        prompt += f"""
-        
-Generic Development Guidelines:
-- Analyze the user's specific requirements carefully
-- Create appropriate project structure
-- Use best practices for the technology involved
-- Provide clear file creation feedback
-- Set up local development servers when applicable
-- Give clear instructions for running the project
-- Handle errors gracefully and provide helpful messages"""
-    
-    # Add quick example if relevant
-    query_lower = user_query.lower()
-    if 'todo' in query_lower and selected_scenario == 'react':
-        prompt += f"\n\nQuick Todo Example:\n{QUICK_EXAMPLES['react_todo']}"
-    elif 'calculator' in query_lower and selected_scenario == 'python':
-        prompt += f"\n\nQuick Calculator Example:\n{QUICK_EXAMPLES['python_calc']}"
-    elif 'api' in query_lower and selected_scenario == 'fastapi':
-        prompt += f"\n\nQuick API Example:\n{QUICK_EXAMPLES['fastapi_api']}"
+    # Build the prompt from tagged fragments within the token budget
+    prompt, report = compile_prompt(select_fragments(user_query, selected_scenario))
+    report["scenario"] = selected_scenario
+    print(format_prompt_report(report))
     
     # Cache the result
-    _prompt_cache[user_query] = prompt
+    _prompt_cache[user_query] = (prompt, report)
+    _last_prompt_report = report
     
     return prompt
 
@@ -0,0 +1,68 @@
+# ============================================================================
+# 🛑 Task Processes - Child processes that cancelling a task can stop
+# ============================================================================
+
+import contextvars
+import os
+import platform
+import signal
+import subprocess
+
+def stop_process(process, timeout=5):
+    """Stop a shell-started process and everything it spawned"""
+    if platform.system() == "Windows":
+        if process.poll() is None:
+            subprocess.run(f"taskkill /F /T /PID {process.pid}", shell=True, capture_output=True)
+        return
+    # Started with start_new_session=True, so the process group id is its pid
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        try:
+            os.killpg(process.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            return
+        try:
+            process.wait(timeout=timeout)
+            return
+        except subprocess.TimeoutExpired:
+            continue
+
+# Child processes of the running task, so /cancel can stop a command that never
+# returns (see main.run_task_in_thread). A context variable rather than a
+# thread-local, so worker threads can inherit it (see tools.run_fullstack_project)
+_task_processes = contextvars.ContextVar("task_processes", default=None)
+
+def set_task_processes(processes):
+    """Collect processes started in this context in `processes` (None to stop collecting)"""
+    _task_processes.set(processes)
+
+def run_tracked(command, cwd=None, timeout=None):
+    """Like subprocess.run(capture_output=True, text=True), but the command runs
+    in its own process group and is registered with the current task, so
+    cancelling the task can stop it and everything it spawned.
+
+    A string runs through the shell, a list is run directly. On timeout the
+    process group is stopped and subprocess.TimeoutExpired is raised.
+    """
+    process = subprocess.Popen(
+        command, shell=isinstance(command, str), cwd=cwd, stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, start_new_session=True
+    )
+    processes = _task_processes.get()
+    if processes is not None:
+        processes.add(process)
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except BaseException:
+        stop_process(process)
+        raise
+    finally:
+        if processes is not None:
+            processes.discard(process)
+    return subprocess.CompletedProcess(command, process.returncode, stdout, stderr)
+
+def stop_task_processes(processes):
+    """Stop every command a task is waiting on; returns how many were stopped"""
+    running = list(processes)
+    for process in running:
+        stop_process(process)
+    return len(running)
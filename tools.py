@@ -3,6 +3,19 @@ import os
 import platform
 import webbrowser
 import socket
+import atexit
+import json
+import re
+import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from task_processes import run_tracked, stop_process
+import verify
+import code_index
+import snapshots
+import load_test
+import project_profiler
+import workspace_manifest
 
 # ============================================================================
 # 🛠️ Essential Tools (Generic & Cross-Platform)
@@ -16,7 +29,8 @@ def run_command(command: str):
         # Detect platform for helpful error messages
         is_windows = platform.system() == "Windows"
         
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
+        result = run_tracked(command)
+        code_index.mark_stale()
         output = result.stdout
         
         if result.stderr:
@@ -40,6 +54,8 @@ def run_command(command: str):
                 print(f"🌐 Server should be running! Check the output above for the local URL.")
         else:
             print(f"⚠️  Command completed with return code: {result.returncode}")
+            # Status line first, so failed installs/builds aren't cached or replayed as successes
+            output = f"❌ Command failed (exit {result.returncode})\n{output}"
         
         return output
     except Exception as e:
@@ -80,7 +96,20 @@ def write_file(filename: str, content: str):
         file_size = os.path.getsize(filename)
         print(f"✅ Created file: {filename} ({file_size} bytes)")
         
-        return f"✅ Successfully created '{filename}' ({file_size} bytes)"
+        result = f"✅ Successfully created '{filename}' ({file_size} bytes)"
+        
+        # Keep the search_code index current without rescanning the workspace
+        code_index.update_file(filename, content)
+        workspace_manifest.update_file(filename, content)
+        
+        # Catch syntax/config errors now instead of at run time
+        if verify.ENABLED:
+            verification = verify.format_verification(*verify.verify_file(filename, content))
+            if verification:
+                print(verification)
+                result += f"\n{verification}"
+        
+        return result
     except Exception as e:
         error_msg = f"❌ Error creating '{filename}': {str(e)}"
         print(error_msg)
@@ -98,11 +127,71 @@ def open_browser(url: str):
         print(error_msg)
         return error_msg
 
+def search_code(query: str, kind: str = "all"):
+    """Find where an identifier is defined/used, or which lines contain some text."""
+    try:
+        print(f"🔍 Searching code: {query} (kind: {kind})")
+        
+        if kind not in ("all", "definition", "usage"):
+            return "❌ Unknown search kind. Please specify: all, definition, usage"
+        
+        result = code_index.search(query, kind)
+        print(f"✅ Search complete for: {query}")
+        return result
+    except Exception as e:
+        error_msg = f"❌ Error searching code: {str(e)}"
+        print(error_msg)
+        return error_msg
+
+def rollback(step: str):
+    """Restore the workspace to an earlier snapshot ("list" shows available snapshots)."""
+    try:
+        if str(step).strip().lower() == "list":
+            return snapshots.list_snapshots()
+        
+        print(f"⏪ Rolling back to snapshot {step}")
+        result = snapshots.rollback(step)
+        code_index.mark_stale()
+        print(result)
+        return result
+    except Exception as e:
+        error_msg = f"❌ Error rolling back: {str(e)}"
+        print(error_msg)
+        return error_msg
+
+def benchmark_endpoint(url: str = "http://localhost:8000/", concurrency: int = 10, duration: int = 10,
+                       requests: list = None, timeout: int = 5):
+    """Load-test a running local server: throughput, p50/p95/p99 latency and error rate."""
+    try:
+        print(f"📈 Benchmarking {url} ({concurrency} connections, {duration}s)")
+        result = load_test.benchmark(url, concurrency, duration, requests, timeout)
+        print(result)
+        return result
+    except Exception as e:
+        error_msg = f"❌ Error benchmarking '{url}': {str(e)}"
+        print(error_msg)
+        return error_msg
+
+def profile_project(target: str = "auto", timeout: int = 30, top: int = 15):
+    """Profile a Python entry point or 'module:function' with cProfile and tracemalloc."""
+    try:
+        print(f"🔬 Profiling {target} (timeout: {timeout}s)")
+        result = project_profiler.profile(target, timeout, top)
+        print(result)
+        return result
+    except Exception as e:
+        error_msg = f"❌ Error profiling '{target}': {str(e)}"
+        print(error_msg)
+        return error_msg
+
 def run_project(project_type: str = "auto"):
     """Automatically detect and run the project based on its type"""
     try:
         print(f"🚀 Attempting to run project (type: {project_type})")
         
+        # Installs and scaffolding change files behind the index's back
+        code_index.mark_stale()
+        
         # Auto-detect project type if not specified
         if project_type == "auto":
             project_type = detect_project_type()
@@ -117,26 +206,33 @@ def run_project(project_type: str = "auto"):
             return run_node_project()
         elif project_type == "python":
             return run_python_project()
+        elif project_type == "fullstack":
+            return run_fullstack_project()
         else:
-            return "❌ Unknown project type. Please specify: react, fastapi, django, node, python"
+            return "❌ Unknown project type. Please specify: react, fastapi, django, node, python, fullstack"
             
     except Exception as e:
         error_msg = f"❌ Error running project: {str(e)}"
         print(error_msg)
         return error_msg
 
-def detect_project_type():
-    """Auto-detect project type based on files in current directory"""
+def detect_project_type(path="."):
+    """Auto-detect project type based on files in the given directory"""
     try:
-        if os.path.exists("package.json"):
-            with open("package.json", "r") as f:
+        if path == "." and len(find_services()) > 1:
+            return "fullstack"
+        
+        package_json = os.path.join(path, "package.json")
+        requirements_txt = os.path.join(path, "requirements.txt")
+        if os.path.exists(package_json):
+            with open(package_json, "r") as f:
                 content = f.read()
                 if "react" in content.lower() or "vite" in content.lower():
                     return "react"
                 else:
                     return "node"
-        elif os.path.exists("requirements.txt"):
-            with open("requirements.txt", "r") as f:
+        elif os.path.exists(requirements_txt):
+            with open(requirements_txt, "r") as f:
                 content = f.read()
                 if "fastapi" in content.lower():
                     return "fastapi"
@@ -144,9 +240,9 @@ def detect_project_type():
                     return "django"
                 else:
                     return "python"
-        elif os.path.exists("manage.py"):
+        elif os.path.exists(os.path.join(path, "manage.py")):
             return "django"
-        elif os.path.exists("main.py") or os.path.exists("app.py"):
+        elif os.path.exists(os.path.join(path, "main.py")) or os.path.exists(os.path.join(path, "app.py")):
             return "python"
         else:
             return "unknown"
@@ -155,56 +251,36 @@ def detect_project_type():
         return "unknown"
 
 def run_react_project():
-    """Run a React project"""
+    """Run a React project (the dev server keeps running in the background)"""
     try:
         print("⚛️  Running React project...")
         
-        # Check if node_modules exists, if not install dependencies
-        if not os.path.exists("node_modules"):
-            print("📦 Installing dependencies...")
-            result = subprocess.run("npm install", shell=True, capture_output=True, text=True)
-            if result.returncode != 0:
-                return f"❌ Failed to install dependencies: {result.stderr}"
-        
-        # Start the development server
-        print("🌐 Starting React development server...")
-        result = subprocess.run("npm start", shell=True, capture_output=True, text=True)
+        # Check if package.json exists
+        if not os.path.exists("package.json"):
+            return "❌ package.json not found. Please ensure this is a React project"
         
-        if result.returncode == 0:
-            return "✅ React project started successfully! Open http://localhost:3000 in your browser"
-        else:
-            return f"❌ Failed to start React project: {result.stderr}"
+        # Installs dependencies if needed, then waits for the dev server's port
+        return bring_up_service(".", "react")
             
     except Exception as e:
         return f"❌ Error running React project: {str(e)}"
 
 def run_fastapi_project():
-    """Run a FastAPI project"""
+    """Run a FastAPI project (the server keeps running in the background)"""
     try:
         print("🚀 Running FastAPI project...")
         
-        # Check if main.py exists
-        if not os.path.exists("main.py"):
+        # Check if main.py (or app.py) exists
+        if not (os.path.exists("main.py") or os.path.exists("app.py")):
             return "❌ main.py not found. Please ensure FastAPI app is in main.py"
         
-        # Install dependencies if needed
-        print("📦 Installing FastAPI dependencies...")
-        result = subprocess.run("pip install fastapi uvicorn", shell=True, capture_output=True, text=True)
-        
-        # Start the server
-        print("🌐 Starting FastAPI server...")
-        result = subprocess.run("uvicorn main:app --reload", shell=True, capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            return "✅ FastAPI project started successfully! Open http://localhost:8000 in your browser"
-        else:
-            return f"❌ Failed to start FastAPI project: {result.stderr}"
+        return bring_up_service(".", "fastapi")
             
     except Exception as e:
         return f"❌ Error running FastAPI project: {str(e)}"
 
 def run_django_project():
-    """Run a Django project"""
+    """Run a Django project (the server keeps running in the background)"""
     try:
         print("🐍 Running Django project...")
         
@@ -212,28 +288,14 @@ def run_django_project():
         if not os.path.exists("manage.py"):
             return "❌ manage.py not found. Please ensure this is a Django project"
         
-        # Install Django if needed
-        print("📦 Installing Django...")
-        result = subprocess.run("pip install django", shell=True, capture_output=True, text=True)
-        
-        # Run migrations
-        print("🔄 Running migrations...")
-        result = subprocess.run("python manage.py migrate", shell=True, capture_output=True, text=True)
-        
-        # Start the server
-        print("🌐 Starting Django server...")
-        result = subprocess.run("python manage.py runserver", shell=True, capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            return "✅ Django project started successfully! Open http://localhost:8000 in your browser"
-        else:
-            return f"❌ Failed to start Django project: {result.stderr}"
+        # Installs Django and runs migrations before starting the server
+        return bring_up_service(".", "django")
             
     except Exception as e:
         return f"❌ Error running Django project: {str(e)}"
 
 def run_node_project():
-    """Run a Node.js project"""
+    """Run a Node.js project (the server keeps running in the background)"""
     try:
         print("🟢 Running Node.js project...")
         
@@ -241,21 +303,7 @@ def run_node_project():
         if not os.path.exists("package.json"):
             return "❌ package.json not found. Please ensure this is a Node.js project"
         
-        # Install dependencies if needed
-        if not os.path.exists("node_modules"):
-            print("📦 Installing dependencies...")
-            result = subprocess.run("npm install", shell=True, capture_output=True, text=True)
-            if result.returncode != 0:
-                return f"❌ Failed to install dependencies: {result.stderr}"
-        
-        # Start the project
-        print("🌐 Starting Node.js project...")
-        result = subprocess.run("npm start", shell=True, capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            return "✅ Node.js project started successfully! Check console output for server URL"
-        else:
-            return f"❌ Failed to start Node.js project: {result.stderr}"
+        return bring_up_service(".", "node")
             
     except Exception as e:
         return f"❌ Error running Node.js project: {str(e)}"
@@ -279,7 +327,7 @@ def run_python_project():
         
         # Run the Python file
         print(f"🚀 Running {main_file}...")
-        result = subprocess.run(f"python {main_file}", shell=True, capture_output=True, text=True)
+        result = run_tracked(f"python {main_file}")
         
         if result.returncode == 0:
             return f"✅ Python project ({main_file}) started successfully!"
@@ -289,6 +337,229 @@ def run_python_project():
     except Exception as e:
         return f"❌ Error running Python project: {str(e)}"
 
+# ============================================================================
+# 🧩 Full-Stack Bring-Up (services installed and started in parallel)
+# ============================================================================
+
+# Sub-directories that hold one service of a multi-service workspace
+SERVICE_DIRS = ["frontend", "backend", "client", "server", "web", "api"]
+
+# Background server processes started by bring_up_service, keyed by service dir
+_background_processes = {}
+
+def find_services(root="."):
+    """Find service sub-directories with a detectable project type"""
+    services = []
+    for name in SERVICE_DIRS:
+        path = os.path.join(root, name)
+        if os.path.isdir(path):
+            project_type = detect_project_type(path)
+            if project_type != "unknown":
+                services.append((path, project_type))
+    return services
+
+def _read_package_scripts(path):
+    """Return the scripts section of a package.json, or an empty dict"""
+    try:
+        with open(os.path.join(path, "package.json"), "r", encoding="utf-8") as f:
+            return json.load(f).get("scripts", {})
+    except (OSError, ValueError):
+        return {}
+
+def _python_entry_module(path):
+    """Find the module holding the FastAPI app (main.py or app.py)"""
+    for module in ["main", "app"]:
+        if os.path.exists(os.path.join(path, f"{module}.py")):
+            return module
+    return "main"
+
+def get_service_plan(path, project_type):
+    """Return (install_commands, start_command, port, env) for a service"""
+    env = {}
+    requirements = os.path.exists(os.path.join(path, "requirements.txt"))
+    
+    if project_type in ("react", "node"):
+        install = [] if os.path.exists(os.path.join(path, "node_modules")) else ["npm install"]
+        scripts = _read_package_scripts(path)
+        if "dev" in scripts:
+            start = "npm run dev"
+        else:
+            start = "npm start"
+        if project_type == "react":
+            port = 5173 if "vite" in scripts.get("dev", "") else 3000
+            env["BROWSER"] = "none"  # Don't let CRA open a browser tab
+        else:
+            port = 5000  # Keep Node backends off the frontend's port
+            env["PORT"] = str(port)
+    elif project_type == "fastapi":
+        install = ["pip install -r requirements.txt" if requirements else "pip install fastapi uvicorn"]
+        start = f"uvicorn {_python_entry_module(path)}:app --port 8000"
+        port = 8000
+    elif project_type == "django":
+        install = ["pip install -r requirements.txt" if requirements else "pip install django",
+                   "python manage.py migrate"]
+        start = "python manage.py runserver 8000 --noreload"
+        port = 8000
+    else:
+        install = ["pip install -r requirements.txt"] if requirements else []
+        start = f"python {_python_entry_module(path)}.py"
+        port = None
+    
+    return install, start, port, env
+
+def _localhost_addresses():
+    """Loopback addresses to try, IPv4 and IPv6 (Vite on Node 17+ may bind only ::1)"""
+    addresses = ["127.0.0.1", "::1"]
+    try:
+        for *_, address in socket.getaddrinfo("localhost", None, type=socket.SOCK_STREAM):
+            if address[0] not in addresses:
+                addresses.append(address[0])
+    except socket.gaierror:
+        pass
+    return addresses
+
+def port_in_use(port):
+    """Check whether anything accepts connections on a localhost port"""
+    for host in _localhost_addresses():
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return True
+        except OSError:
+            continue
+    return False
+
+# Log lines where dev servers say where they listen ("Local: http://localhost:5173/",
+# "Server listening on port 3000")
+_LISTEN_LINE_PATTERN = re.compile(r"listen|running|server|started|ready|local", re.IGNORECASE)
+_LISTEN_PORT_PATTERN = re.compile(
+    r"(?:localhost|127\.0\.0\.1|0\.0\.0\.0|\[::1?\]):(\d{2,5})|\bport\s+(\d{2,5})", re.IGNORECASE
+)
+
+def _announced_ports(log_file):
+    """Ports a server printed to its log, in order"""
+    ports = []
+    for line in _tail_log(log_file, lines=200).splitlines():
+        if _LISTEN_LINE_PATTERN.search(line):
+            ports.extend(int(a or b) for a, b in _LISTEN_PORT_PATTERN.findall(line))
+    return ports
+
+def wait_for_server(port, process, log_file, timeout=120):
+    """Wait until the process listens on its port, or on one it announced in its log.
+
+    Returns the port, or None if the process exits or the timeout passes.
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            return None
+        for candidate in dict.fromkeys([port, *_announced_ports(log_file)]):
+            if port_in_use(candidate):
+                # The port may have been taken by something else while the process
+                # died on startup
+                return candidate if process.poll() is None else None
+        time.sleep(0.5)
+    return None
+
+def stop_background_servers():
+    """Stop every server started by bring_up_service (runs at exit)"""
+    for path in list(_background_processes):
+        stop_process(_background_processes.pop(path))
+
+atexit.register(stop_background_servers)
+
+def _tail_log(log_file, lines=15):
+    """Return the last lines of a service log"""
+    try:
+        with open(log_file, "r", encoding="utf-8", errors="replace") as f:
+            return "".join(f.readlines()[-lines:])
+    except OSError:
+        return ""
+
+def bring_up_service(path, project_type, timeout=120):
+    """Install, start in the background and wait for one service"""
+    name = os.path.basename(os.path.abspath(path))
+    started = time.time()
+    install, start, port, env = get_service_plan(path, project_type)
+    
+    # Stop a server left over from a previous bring-up of the same service
+    previous = _background_processes.pop(path, None)
+    if previous:
+        stop_process(previous)
+    
+    # Anything still listening would make the new server fail while looking ready
+    if port is not None and port_in_use(port):
+        return f"❌ {name} ({project_type}): port {port} is already in use by another process. Stop it and retry."
+    
+    for command in install:
+        print(f"📦 [{name}] {command}")
+        result = run_tracked(command, cwd=path)
+        if result.returncode != 0:
+            return f"❌ {name} ({project_type}): '{command}' failed: {result.stderr[-500:]}"
+    
+    print(f"🌐 [{name}] {start}")
+    log_file = os.path.join(path, ".server.log")
+    with open(log_file, "w", encoding="utf-8") as log:
+        # Own process group, so stop_process also stops npm/uvicorn children of the shell
+        process = subprocess.Popen(
+            start, shell=True, cwd=path, stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+            env={**os.environ, **env}, start_new_session=True
+        )
+    _background_processes[path] = process
+    
+    elapsed = time.time() - started
+    if port is None:
+        return f"✅ {name} ({project_type}) started in the background ({elapsed:.1f}s)"
+    
+    ready_port = wait_for_server(port, process, log_file, timeout)
+    elapsed = time.time() - started
+    if ready_port:
+        return f"✅ {name} ({project_type}) ready at http://localhost:{ready_port} ({elapsed:.1f}s)"
+    
+    if _background_processes.get(path) is process:
+        del _background_processes[path]
+    exit_code = process.poll()
+    if exit_code == 0 and project_type == "node":
+        # Not every Node project is a server
+        return f"✅ {name} (node) ran and exited cleanly ({elapsed:.1f}s). Output:\n{_tail_log(log_file)}"
+    stop_process(process)  # Don't leave a server that never got ready running
+    reason = f"did not open port {port} within {timeout}s" if exit_code is None else f"exited with code {exit_code}"
+    return f"❌ {name} ({project_type}) {reason}. Last log lines:\n{_tail_log(log_file)}"
+
+def run_fullstack_project(timeout: int = 120):
+    """Bring up every service of a frontend/backend workspace concurrently"""
+    try:
+        services = find_services()
+        if not services:
+            return f"❌ No services found. Expected sub-directories like: {', '.join(SERVICE_DIRS)}"
+        
+        print(f"🧩 Bringing up {len(services)} services in parallel: "
+              f"{', '.join(f'{path} ({kind})' for path, kind in services)}")
+        started = time.time()
+        
+        # Each worker runs in a copy of this context, so installs stay registered
+        # with the task (for /cancel) and their output goes to the task log
+        contexts = [contextvars.copy_context() for _ in services]
+        with ThreadPoolExecutor(max_workers=len(services)) as executor:
+            results = list(executor.map(
+                lambda context, service: context.run(bring_up_service, *service, timeout),
+                contexts, services
+            ))
+        
+        elapsed = time.time() - started
+        if all(result.startswith("✅") for result in results):
+            status = "✅ All services ready"
+        else:
+            # A half-started stack isn't usable; don't leave the healthy services running
+            for path, _ in services:
+                process = _background_processes.pop(path, None)
+                if process:
+                    stop_process(process)
+            status = "❌ Some services failed (stopped the others)"
+        return f"{status} in {elapsed:.1f}s:\n" + "\n".join(f"  {result}" for result in results)
+    
+    except Exception as e:
+        return f"❌ Error running full-stack project: {str(e)}"
+
 # ============================================================================
 # Tool Registry (Simplified)
 # ============================================================================
@@ -299,6 +570,10 @@ TOOL_REGISTRY = {
     "write_file": write_file,        # Write file contents
     "open_browser": open_browser,    # Open URL in browser
     "run_project": run_project,      # Auto-run project
+    "search_code": search_code,      # Find definitions/usages in the workspace
+    "rollback": rollback,            # Restore a step-boundary snapshot
+    "benchmark_endpoint": benchmark_endpoint,  # Load-test a running server
+    "profile_project": profile_project,        # cProfile/tracemalloc hotspots
 }
 
 # Example usage
@@ -0,0 +1,248 @@
+# ============================================================================
+# 🔁 Trace Replay Cache - Reuse successful tool traces for similar queries
+# ============================================================================
+
+import hashlib
+import json
+import os
+import re
+import time
+import threading
+from collections import Counter
+
+# Cache settings
+ENABLED = True
+ADJUST_WITH_LLM = True          # One LLM call to adapt names when the query isn't identical
+CACHE_FILE = ".trace_cache.json"
+MAX_ENTRIES = 200               # Least recently used traces are evicted past this
+SIMILARITY_THRESHOLD = 0.4      # Minimum estimated Jaccard similarity for a renamed hit
+MAX_RENAMED_WORDS = 1           # Words a hit may swap (entity renames); it may never add or drop words
+MIN_SHARED_WORDS = 2            # Words a renamed query must still share with the cached one
+NUM_PERMUTATIONS = 64           # MinHash signature length
+SHINGLE_SIZE = 3                # Character shingle length
+
+# Words that don't change what the user wants built
+_FILLER_WORDS = {
+    "a", "an", "the", "please", "me", "for", "with", "of", "to", "and", "my",
+    "make", "create", "build", "generate", "write", "simple", "basic", "new",
+    "can", "you", "i", "want", "need", "some", "using", "in",
+}
+
+# Words that say what kind of project to build; swapping one is a different
+# project, not a rename (a calculator app is not a renamed todo app)
+_PROJECT_WORDS = {
+    "react", "vue", "svelte", "angular", "next", "node", "express", "fastapi", "flask",
+    "django", "python", "typescript", "javascript", "html", "css", "tailwind",
+    "app", "api", "website", "site", "page", "server", "backend", "frontend", "fullstack",
+    "cli", "script", "bot", "game", "todo", "calculator", "weather", "chat", "blog",
+    "auth", "login", "signup", "dashboard", "portfolio", "landing", "shop", "store",
+    "cart", "quiz", "timer", "notes", "tracker", "crud", "search", "upload", "payment",
+}
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+def _make_permutations():
+    """Deterministic (a, b) pairs so signatures stay comparable across runs"""
+    permutations = []
+    for i in range(NUM_PERMUTATIONS):
+        digest = hashlib.sha1(f"minhash-{i}".encode()).digest()
+        a = int.from_bytes(digest[:8], "big") % _MERSENNE_PRIME or 1
+        b = int.from_bytes(digest[8:16], "big") % _MERSENNE_PRIME
+        permutations.append((a, b))
+    return permutations
+
+_PERMUTATIONS = _make_permutations()
+
+# Loaded lazily from CACHE_FILE
+_cache = None
+# Tasks may run in parallel (see main.run_repl)
+_lock = threading.RLock()
+
+def normalize_query(query):
+    """Lowercase, strip punctuation and filler words from a query"""
+    words = re.findall(r"[a-z0-9]+", query.lower())
+    return " ".join(word for word in words if word not in _FILLER_WORDS)
+
+def _shingles(text):
+    """Split normalized text into overlapping character shingles"""
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+def compute_signature(normalized_query):
+    """Compute the MinHash signature of a normalized query"""
+    hashes = [
+        int.from_bytes(hashlib.md5(shingle.encode()).digest()[:4], "big")
+        for shingle in _shingles(normalized_query)
+    ]
+    return [
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    ]
+
+def estimate_similarity(signature_a, signature_b):
+    """Estimate Jaccard similarity from two MinHash signatures"""
+    if not signature_a or len(signature_a) != len(signature_b):
+        return 0.0
+    matches = sum(1 for x, y in zip(signature_a, signature_b) if x == y)
+    return matches / len(signature_a)
+
+def _empty_cache():
+    return {
+        "entries": {},
+        "stats": {"lookups": 0, "hits": 0, "replays_ok": 0, "replays_failed": 0},
+    }
+
+def _load_cache():
+    """Load the cache from disk once per process"""
+    global _cache
+    if _cache is not None:
+        return _cache
+
+    _cache = _empty_cache()
+    if os.path.exists(CACHE_FILE):
+        try:
+            with open(CACHE_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            _cache["entries"].update(data.get("entries", {}))
+            _cache["stats"].update(data.get("stats", {}))
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not load trace cache, starting empty: {e}")
+    return _cache
+
+def _save_cache():
+    """Write the cache to disk atomically"""
+    cache = _load_cache()
+    temp_file = f"{CACHE_FILE}.tmp"
+    try:
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(temp_file, CACHE_FILE)
+    except OSError as e:
+        print(f"⚠️  Could not save trace cache: {e}")
+
+def _evict_if_needed(entries):
+    """Drop least recently used traces until the cache fits MAX_ENTRIES"""
+    while len(entries) > MAX_ENTRIES:
+        oldest = min(entries, key=lambda key: entries[key]["last_used"])
+        del entries[oldest]
+
+def is_failed_result(result):
+    """Check whether a tool result string reports a failure"""
+    text = str(result).lstrip()
+    return (
+        text.startswith("❌")
+        or text.startswith("Error executing tool")
+        or (text.startswith("Tool '") and "not found" in text)
+    )
+
+def count_renamed_words(normalized, cached_normalized):
+    """Return how many words a query swapped relative to a cached one.
+
+    Returns None when the query adds or drops words, since a replayed
+    trace can't build anything the cached query didn't ask for, or when
+    a swapped word names the kind of project rather than an entity.
+    """
+    words = Counter(normalized.split())
+    cached_words = Counter(cached_normalized.split())
+    added_words = words - cached_words
+    removed_words = cached_words - words
+    added = sum(added_words.values())
+    removed = sum(removed_words.values())
+    if added != removed:
+        return None
+    if _PROJECT_WORDS & (set(added_words) | set(removed_words)):
+        return None
+    if added and sum(cached_words.values()) - removed < MIN_SHARED_WORDS:
+        return None
+    return added
+
+def find_similar_trace(user_query, workspace=None):
+    """Return (trace_id, entry, similarity) for the best rename-only match, else None.
+
+    Only traces recorded from the same WORKSPACE state (see
+    workspace_manifest.fingerprint) are considered.
+    """
+    with _lock:
+        cache = _load_cache()
+        cache["stats"]["lookups"] += 1
+
+        normalized = normalize_query(user_query)
+        if not normalized:
+            return None
+
+        signature = compute_signature(normalized)
+        best = None
+        for trace_id, entry in cache["entries"].items():
+            if entry.get("workspace") != workspace:
+                continue
+            renamed = count_renamed_words(normalized, entry["normalized"])
+            if renamed is None or renamed > MAX_RENAMED_WORDS:
+                continue
+            if entry["normalized"] == normalized:
+                similarity = 1.0
+            else:
+                similarity = estimate_similarity(signature, entry["signature"])
+                if similarity < SIMILARITY_THRESHOLD:
+                    continue
+            if best is None or similarity > best[2]:
+                best = (trace_id, entry, similarity)
+
+        if best:
+            cache["stats"]["hits"] += 1
+            best[1]["last_used"] = time.time()
+            best[1]["hits"] = best[1].get("hits", 0) + 1
+        return best
+
+def store_trace(user_query, actions, output, workspace=None):
+    """Store the successful actions that led to OUTPUT for a query started from WORKSPACE"""
+    with _lock:
+        if not actions:
+            return
+
+        cache = _load_cache()
+        normalized = normalize_query(user_query)
+        if not normalized:
+            return
+
+        trace_id = hashlib.sha1(f"{workspace}:{normalized}".encode()).hexdigest()[:16]
+        now = time.time()
+        cache["entries"][trace_id] = {
+            "query": user_query,
+            "normalized": normalized,
+            "signature": compute_signature(normalized),
+            "workspace": workspace,
+            "actions": actions,
+            "output": output,
+            "created": now,
+            "last_used": now,
+            "hits": 0,
+        }
+        _evict_if_needed(cache["entries"])
+        _save_cache()
+        print(f"💾 Stored trace with {len(actions)} actions for: {user_query[:50]}")
+
+def discard_trace(trace_id):
+    """Remove a trace that failed to replay"""
+    with _lock:
+        cache = _load_cache()
+        if cache["entries"].pop(trace_id, None) is not None:
+            _save_cache()
+
+def record_replay(success):
+    """Record the outcome of a trace replay"""
+    with _lock:
+        cache = _load_cache()
+        cache["stats"]["replays_ok" if success else "replays_failed"] += 1
+        _save_cache()
+
+def get_cache_stats():
+    """Return entry count and hit-rate statistics"""
+    with _lock:
+        cache = _load_cache()
+        stats = dict(cache["stats"])
+        stats["entries"] = len(cache["entries"])
+        stats["max_entries"] = MAX_ENTRIES
+        stats["hit_rate"] = stats["hits"] / stats["lookups"] if stats["lookups"] else 0.0
+        return stats
@@ -0,0 +1,235 @@
+# ============================================================================
+# 🔎 Fast Verification - In-process checks for generated files
+# ============================================================================
+
+import ast
+import hashlib
+import importlib.util
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import tomllib  # Python 3.11+
+except ImportError:
+    tomllib = None
+
+try:
+    import yaml  # Optional: only used when PyYAML is installed
+except ImportError:
+    yaml = None
+
+ENABLED = True
+VERIFY_TIMEOUT = 2              # Seconds to wait for checks before giving up
+MAX_CACHE_ENTRIES = 500
+
+JS_EXTENSIONS = (".js", ".jsx", ".ts", ".tsx", ".mjs", ".cjs")
+JS_RESOLVE_SUFFIXES = ["", ".js", ".jsx", ".ts", ".tsx", ".json",
+                       "/index.js", "/index.jsx", "/index.ts", "/index.tsx"]
+
+_JS_IMPORT_PATTERN = re.compile(
+    r"""(?:import\s+(?:[\w*{}\s,]+\s+from\s+)?|require\(\s*|import\(\s*)['"](\.{1,2}/[^'"]+)['"]"""
+)
+
+# JSON config files that tools read as JSONC (comments and trailing commas allowed)
+_JSONC_NAME_PATTERN = re.compile(r"^(tsconfig.*|jsconfig.*)\.json$")
+# Strings are matched (and kept) so comment markers inside them are left alone
+_JSONC_TOKEN_PATTERN = re.compile(r'"(?:\\.|[^"\\])*"|//[^\n]*|/\*.*?\*/|,(?=\s*[}\]])', re.DOTALL)
+
+# Distribution names whose import name differs
+_IMPORT_NAMES = {
+    "python_dotenv": "dotenv", "pyyaml": "yaml", "beautifulsoup4": "bs4", "pillow": "pil",
+    "scikit_learn": "sklearn", "opencv_python": "cv2", "psycopg2_binary": "psycopg2",
+    "python_multipart": "multipart", "python_jose": "jose", "pyjwt": "jwt",
+}
+_REQUIREMENT_NAME_PATTERN = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="verify")
+
+# Results keyed by (check name, path, content hash)
+_result_cache = {}
+
+def _content_hash(content):
+    return hashlib.sha256(content.encode("utf-8", errors="replace")).hexdigest()
+
+def check_python_syntax(filename, content):
+    """Compile Python source without running it"""
+    try:
+        compile(content, filename, "exec")
+        return [], []
+    except SyntaxError as e:
+        return [f"SyntaxError line {e.lineno}: {e.msg}"], []
+
+def is_jsonc_file(filename):
+    """tsconfig/jsconfig and VS Code settings may contain comments"""
+    name = os.path.basename(filename).lower()
+    parent = os.path.basename(os.path.dirname(os.path.abspath(filename)))
+    return bool(_JSONC_NAME_PATTERN.match(name)) or parent == ".vscode"
+
+def strip_jsonc(content):
+    """Remove comments and trailing commas from JSONC text"""
+    def replace(match):
+        return match.group(0) if match.group(0).startswith('"') else ""
+    # Second pass catches trailing commas that were followed by a comment
+    return _JSONC_TOKEN_PATTERN.sub(replace, _JSONC_TOKEN_PATTERN.sub(replace, content))
+
+def check_json(filename, content):
+    """Parse JSON files such as package.json and tsconfig.json (as JSONC)"""
+    try:
+        json.loads(strip_jsonc(content) if is_jsonc_file(filename) else content)
+        return [], []
+    except ValueError as e:
+        return [f"Invalid JSON: {e}"], []
+
+def check_toml(filename, content):
+    """Parse TOML files (pyproject.toml) when tomllib is available"""
+    if tomllib is None:
+        return [], []
+    try:
+        tomllib.loads(content)
+        return [], []
+    except tomllib.TOMLDecodeError as e:
+        return [f"Invalid TOML: {e}"], []
+
+def check_yaml(filename, content):
+    """Parse YAML files when PyYAML is installed"""
+    if yaml is None:
+        return [], []
+    try:
+        list(yaml.safe_load_all(content))
+        return [], []
+    except yaml.YAMLError as e:
+        return [f"Invalid YAML: {str(e).splitlines()[0]}"], []
+
+def _python_module_exists(module, base_dir):
+    """Check whether a top-level module is stdlib, installed or a local file"""
+    if module in sys.builtin_module_names or module in getattr(sys, "stdlib_module_names", ()):
+        return True
+    for directory in {base_dir, "."}:
+        if os.path.exists(os.path.join(directory, f"{module}.py")) or os.path.isdir(os.path.join(directory, module)):
+            return True
+    try:
+        return importlib.util.find_spec(module) is not None
+    except (ImportError, ValueError):
+        return False
+
+def _normalize_package(name):
+    name = re.sub(r"[-.]", "_", name.lower())
+    return _IMPORT_NAMES.get(name, name)
+
+def declared_dependencies(base_dir):
+    """Import names of packages listed in a nearby requirements.txt or pyproject.toml"""
+    declared = set()
+    for directory in {base_dir, os.path.dirname(os.path.abspath(base_dir)), "."}:
+        requirements = os.path.join(directory, "requirements.txt")
+        if os.path.exists(requirements):
+            with open(requirements, "r", encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    match = _REQUIREMENT_NAME_PATTERN.match(line)
+                    if match and not line.lstrip().startswith(("#", "-")):
+                        declared.add(_normalize_package(match.group(1)))
+        pyproject = os.path.join(directory, "pyproject.toml")
+        if tomllib is not None and os.path.exists(pyproject):
+            try:
+                with open(pyproject, "rb") as f:
+                    config = tomllib.load(f)
+            except (OSError, tomllib.TOMLDecodeError):
+                continue
+            requirements = list(config.get("project", {}).get("dependencies", []))
+            requirements += list(config.get("tool", {}).get("poetry", {}).get("dependencies", {}))
+            for requirement in requirements:
+                match = _REQUIREMENT_NAME_PATTERN.match(requirement)
+                if match:
+                    declared.add(_normalize_package(match.group(1)))
+    return declared
+
+def check_python_imports(filename, content):
+    """Warn about imports that don't resolve to stdlib, installed, declared or local modules"""
+    try:
+        tree = ast.parse(content)
+    except SyntaxError:
+        return [], []  # Reported by check_python_syntax
+
+    base_dir = os.path.dirname(filename) or "."
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            modules.add(node.module.split(".")[0])
+
+    missing = [module for module in modules if not _python_module_exists(module, base_dir)]
+    if missing:
+        # Declared but not installed yet is normal before 'pip install'
+        declared = declared_dependencies(base_dir)
+        missing = [module for module in missing if module.lower() not in declared]
+    return [], [f"Import '{module}' not found (add it to requirements.txt or create {module}.py)"
+                for module in sorted(missing)]
+
+def check_js_imports(filename, content):
+    """Warn about relative JS/TS imports that don't resolve to a file"""
+    base_dir = os.path.dirname(filename) or "."
+    warnings = []
+    for target in sorted(set(_JS_IMPORT_PATTERN.findall(content))):
+        path = os.path.normpath(os.path.join(base_dir, target))
+        if not any(os.path.isfile(path + suffix) for suffix in JS_RESOLVE_SUFFIXES):
+            warnings.append(f"Import '{target}' does not resolve to a file yet")
+    return [], warnings
+
+def get_checks(filename):
+    """Return the checks that apply to a file, by extension"""
+    name = os.path.basename(filename).lower()
+    if name.endswith(".py"):
+        return [check_python_syntax, check_python_imports]
+    if name.endswith(".json"):
+        return [check_json]
+    if name.endswith(".toml"):
+        return [check_toml]
+    if name.endswith((".yaml", ".yml")):
+        return [check_yaml]
+    if name.endswith(JS_EXTENSIONS):
+        return [check_js_imports]
+    return []
+
+def _run_check(check, filename, content, digest):
+    # Import checks depend on other files, so only pure parsing checks are cached
+    cacheable = check not in (check_python_imports, check_js_imports)
+    key = (check.__name__, filename, digest)
+    if cacheable and key in _result_cache:
+        return _result_cache[key]
+
+    result = check(filename, content)
+    if cacheable:
+        if len(_result_cache) >= MAX_CACHE_ENTRIES:
+            _result_cache.pop(next(iter(_result_cache)))
+        _result_cache[key] = result
+    return result
+
+def verify_file(filename, content):
+    """Run the applicable checks in the worker pool; return (errors, warnings)"""
+    checks = get_checks(filename)
+    if not checks:
+        return [], []
+
+    digest = _content_hash(content)
+    futures = [_executor.submit(_run_check, check, filename, content, digest) for check in checks]
+
+    errors, warnings = [], []
+    for future in futures:
+        try:
+            check_errors, check_warnings = future.result(timeout=VERIFY_TIMEOUT)
+        except Exception as e:
+            check_warnings, check_errors = [f"Verification skipped: {e}"], []
+        errors.extend(check_errors)
+        warnings.extend(check_warnings)
+    return errors, warnings
+
+def format_verification(errors, warnings):
+    """Format verification results for a tool result, or '' when clean"""
+    lines = [f"❌ {error}" for error in errors] + [f"⚠️  {warning}" for warning in warnings]
+    if not lines:
+        return ""
+    header = "🔎 Verification failed - fix before continuing:" if errors else "🔎 Verification warnings:"
+    return "\n".join([header] + [f"   {line}" for line in lines])
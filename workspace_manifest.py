@@ -0,0 +1,234 @@
+# ============================================================================
+# 🗂️ Workspace Manifest - Compact file tree carried across queries
+# ============================================================================
+
+import ast
+import hashlib
+import json
+import os
+import re
+import threading
+import workspace_paths
+
+ENABLED = True
+SKIP_DIRS = workspace_paths.SKIP_DIRS
+SKIP_FILES = workspace_paths.SKIP_FILES | {"package-lock.json", "yarn.lock", "pnpm-lock.yaml"}
+MAX_MANIFEST_FILES = 40         # Files listed in the injected manifest
+MAX_SUMMARY_SIZE = 256 * 1024   # Larger files are listed without a summary
+MAX_HASH_SIZE = 8 * 1024 * 1024 # Larger files are never read; changes are tracked by size and mtime
+MAX_SCANNED_FILES = 5000        # refresh() stops walking the workspace past this
+MAX_SUMMARY_NAMES = 6
+
+_JS_EXPORT_PATTERN = re.compile(
+    r"export\s+(?:default\s+)?(?:async\s+)?(?:function|class|const|let|var)\s+([A-Za-z_$][\w$]*)"
+)
+_HTML_TITLE_PATTERN = re.compile(r"<title>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+
+# path -> {"mtime", "size", "hash", "summary"}
+_manifest = {}
+# path -> hash at the start of the previous query (None before the first query)
+_previous_state = None
+# Tasks may run in parallel (see main.run_repl)
+_lock = threading.RLock()
+
+def _names(names):
+    names = list(names)
+    shown = ", ".join(names[:MAX_SUMMARY_NAMES])
+    return shown + (f" +{len(names) - MAX_SUMMARY_NAMES}" if len(names) > MAX_SUMMARY_NAMES else "")
+
+def _summarize_python(content):
+    try:
+        tree = ast.parse(content)
+    except SyntaxError as e:
+        return f"syntax error line {e.lineno}"
+    parts = []
+    docstring = ast.get_docstring(tree)
+    if docstring:
+        parts.append(docstring.strip().splitlines()[0][:60])
+    if "FastAPI(" in content:
+        parts.append("FastAPI app")
+    classes = [node.name for node in tree.body if isinstance(node, ast.ClassDef)]
+    functions = [node.name for node in tree.body if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))]
+    if classes:
+        parts.append(f"classes: {_names(classes)}")
+    if functions:
+        parts.append(f"defs: {_names(functions)}")
+    return "; ".join(parts)
+
+def _summarize_package_json(content):
+    try:
+        package = json.loads(content)
+    except ValueError:
+        return "invalid JSON"
+    parts = [package.get("name", "")]
+    if package.get("scripts"):
+        parts.append(f"scripts: {_names(package['scripts'])}")
+    dependencies = {**package.get("dependencies", {}), **package.get("devDependencies", {})}
+    if dependencies:
+        parts.append(f"deps: {_names(dependencies)}")
+    return "; ".join(part for part in parts if part)
+
+def summarize_file(path, content):
+    """Return a one-line summary of a key file, or '' for other files"""
+    name = os.path.basename(path).lower()
+    if name.endswith(".py"):
+        return _summarize_python(content)
+    if name == "package.json":
+        return _summarize_package_json(content)
+    if name == "requirements.txt":
+        packages = [line.split("==")[0].strip() for line in content.splitlines()
+                    if line.strip() and not line.startswith("#")]
+        return f"packages: {_names(packages)}"
+    if name.endswith((".js", ".jsx", ".ts", ".tsx", ".mjs")):
+        exports = list(dict.fromkeys(_JS_EXPORT_PATTERN.findall(content)))
+        return f"exports: {_names(exports)}" if exports else ""
+    if name.endswith(".html"):
+        match = _HTML_TITLE_PATTERN.search(content)
+        return f"title: {match.group(1).strip()[:60]}" if match else ""
+    if name.endswith(".md"):
+        heading = next((line.lstrip("# ").strip() for line in content.splitlines() if line.startswith("#")), "")
+        return heading[:60]
+    return ""
+
+def _manifest_path(path):
+    """Key files by their path relative to the workspace root, however they were named"""
+    try:
+        return os.path.normpath(os.path.relpath(path))
+    except ValueError:  # Different drive on Windows
+        return os.path.normpath(os.path.abspath(path))
+
+def _read_file(path, stat):
+    """Return (hash, text for the summary) without loading large files into memory"""
+    if stat.st_size > MAX_HASH_SIZE:
+        return f"{stat.st_size}-{stat.st_mtime_ns}", ""
+    digest = hashlib.sha1()
+    text = ""
+    with open(path, "rb") as f:
+        if stat.st_size <= MAX_SUMMARY_SIZE:
+            data = f.read()
+            digest.update(data)
+            text = data.decode("utf-8", errors="replace")
+        else:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:12], text
+
+def update_file(path, content=None):
+    """Refresh one manifest entry; called after each write_file"""
+    with _lock:
+        path = _manifest_path(path)
+        try:
+            stat = os.stat(path)
+            if content is None:
+                file_hash, text = _read_file(path, stat)
+            else:
+                file_hash = hashlib.sha1(content.encode("utf-8")).hexdigest()[:12]
+                text = content if stat.st_size <= MAX_SUMMARY_SIZE else ""
+        except OSError:
+            _manifest.pop(path, None)
+            return
+
+        _manifest[path] = {
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "hash": file_hash,
+            "summary": summarize_file(path, text) if text else "",
+        }
+
+def refresh(root="."):
+    """Pick up files changed outside write_file (shell commands), by mtime.
+
+    Unchanged files are only stat'ed; the walk stops after MAX_SCANNED_FILES.
+    """
+    with _lock:
+        seen = set()
+        truncated = False
+        agent_files = workspace_paths.agent_files()
+        for directory, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(name for name in dirnames if name not in SKIP_DIRS)
+            if len(seen) >= MAX_SCANNED_FILES:
+                truncated = True
+                break
+            for filename in sorted(filenames):
+                if filename in SKIP_FILES:
+                    continue
+                path = os.path.normpath(os.path.join(directory, filename))
+                if path in agent_files:
+                    continue
+                seen.add(path)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entry = _manifest.get(path)
+                if entry is None or entry["mtime"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+                    update_file(path)
+        for path in list(_manifest):
+            if path not in seen and (not truncated or not os.path.exists(path)):
+                del _manifest[path]
+
+def _format_size(size):
+    return f"{size} B" if size < 1024 else f"{size / 1024:.1f} KB"
+
+def _format_entry(path):
+    entry = _manifest[path]
+    summary = f" - {entry['summary']}" if entry["summary"] else ""
+    return f"{path} ({_format_size(entry['size'])}){summary}"
+
+def format_manifest():
+    """Compact file tree with sizes and summaries, key files first when capped"""
+    paths = sorted(_manifest, key=lambda path: (path.count(os.sep), path))
+    if len(paths) > MAX_MANIFEST_FILES:
+        key_files = [path for path in paths if _manifest[path]["summary"]]
+        other_files = [path for path in paths if not _manifest[path]["summary"]]
+        paths = sorted((key_files + other_files)[:MAX_MANIFEST_FILES])
+    else:
+        paths = sorted(paths)
+
+    total = sum(entry["size"] for entry in _manifest.values())
+    lines = [f"🗂️ Workspace manifest ({len(_manifest)} files, {_format_size(total)}):"]
+    lines.extend(f"  {_format_entry(path)}" for path in paths)
+    if len(_manifest) > len(paths):
+        lines.append(f"  ... {len(_manifest) - len(paths)} more files")
+    return "\n".join(lines)
+
+def format_diff(previous):
+    """Files added, modified and deleted since `previous` ({path: hash})"""
+    added = sorted(path for path in _manifest if path not in previous)
+    modified = sorted(path for path in _manifest if path in previous and previous[path] != _manifest[path]["hash"])
+    deleted = sorted(path for path in previous if path not in _manifest)
+    if not (added or modified or deleted):
+        return "🔄 No file changes since the previous query"
+
+    lines = [f"🔄 Changes since the previous query: +{len(added)} added, ~{len(modified)} modified, -{len(deleted)} deleted"]
+    lines.extend(f"  + {path}" for path in added[:MAX_MANIFEST_FILES])
+    lines.extend(f"  ~ {path}" for path in modified[:MAX_MANIFEST_FILES])
+    lines.extend(f"  - {path}" for path in deleted[:MAX_MANIFEST_FILES])
+    return "\n".join(lines)
+
+def fingerprint():
+    """Hash of the whole workspace, so cached traces only replay from the state they started in"""
+    with _lock:
+        refresh()
+        digest = hashlib.sha1()
+        for path in sorted(_manifest):
+            digest.update(f"{path}\0{_manifest[path]['hash']}\n".encode())
+        return digest.hexdigest()[:16]
+
+def query_context():
+    """Manifest plus the diff since the previous query, for the start of a query.
+
+    Returns '' for an empty workspace.
+    """
+    global _previous_state
+    with _lock:
+        refresh()
+        previous = _previous_state
+        _previous_state = {path: entry["hash"] for path, entry in _manifest.items()}
+        if not _manifest and not previous:
+            return ""
+
+        sections = [format_manifest()]
+        if previous is not None:
+            sections.append(format_diff(previous))
+        return "\n\n".join(sections)
@@ -0,0 +1,32 @@
+# ============================================================================
+# 📂 Workspace Paths - What the workspace scanners (index, snapshots, manifest) skip
+# ============================================================================
+
+import os
+import sys
+
+SNAPSHOT_DIR = ".snapshots"     # See snapshots.py
+TASK_LOG_DIR = ".task_logs"     # Full verbose output of each REPL task (see main.run_repl)
+
+# Dependency, build and agent bookkeeping directories
+SKIP_DIRS = {"node_modules", ".git", "venv", ".venv", "env", "__pycache__", "dist", "build",
+             ".next", ".pytest_cache", ".mypy_cache", SNAPSHOT_DIR, TASK_LOG_DIR}
+
+# Agent bookkeeping files written into the workspace
+SKIP_FILES = {".trace_cache.json", ".trace_cache.json.tmp", ".server.log"}
+
+def agent_files():
+    """Relative paths of the agent's own loaded modules that live in the workspace.
+
+    When the agent runs from the project directory, its modules aren't
+    project files: scanners skip them, and rollback never rewrites them.
+    """
+    cwd = os.path.realpath(os.getcwd())
+    files = set()
+    for module in list(sys.modules.values()):
+        filename = getattr(module, "__file__", None)
+        if filename:
+            path = os.path.relpath(os.path.realpath(filename), cwd)
+            if not path.startswith(os.pardir):
+                files.add(os.path.normpath(path))
+    return files